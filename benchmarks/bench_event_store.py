@@ -0,0 +1,123 @@
+# benchmarks/bench_event_store.py
+# Insert and query throughput of the webhook event store:
+#   sqlite (old)    -> the previous storage.py path: new connection per call
+#   sqlite          -> SQLiteEventStore: kept-open writer + reader pool
+#   sqlite bulk     -> insert_events() in batches (one statement per 500 rows)
+#   postgres / bulk -> PostgresEventStore, only with --postgres URL (pip install asyncpg)
+# Inserts go through the real processors (stats, label index, search), like webhooks do.
+#
+# Usage (from project root):
+#   PYTHONPATH=$PWD python benchmarks/bench_event_store.py [events] [--postgres postgresql://...]
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+
+import aiosqlite
+import structlog
+
+for k, v in {"GITHUB_TOKEN": "x", "GITHUB_OWNER": "o", "GITHUB_REPO": "r", "WEBHOOK_SECRET": "s"}.items():
+    os.environ.setdefault(k, v)
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(30))  # per-handler logs off
+
+from src import processors  # noqa: E402
+from src.deps import get_container  # noqa: E402
+from src.event_store import SQLITE_CREATE_SQL, PostgresEventStore, SQLiteEventStore  # noqa: E402
+
+CONCURRENCY = 8  # webhook deliveries in flight at once
+
+
+def make_events(n: int):
+    run = uuid.uuid4().hex[:8]
+    rows = []
+    for i in range(n):
+        payload = {"action": "created", "issue": {"number": i % 200 + 1},
+                   "comment": {"id": i + 1, "body": f"comment {i} " * 20, "created_at": "2024-09-01T00:00:00Z"}}
+        rows.append((f"bench-{run}-{i}", "issue_comment", "created", i % 200 + 1, json.dumps(payload), payload))
+    return rows
+
+
+async def old_insert(path, row):
+    async with aiosqlite.connect(path) as db:
+        cur = await db.execute(
+            "INSERT OR IGNORE INTO events (delivery_id, event, action, issue_number, payload) VALUES (?, ?, ?, ?, ?)",
+            (row[0], row[1], row[2], row[3], row[4]),
+        )
+        if cur.rowcount == 1:
+            await processors.process_event(db, row[1], row[2], row[5])
+        await db.commit()
+
+
+async def old_query(path, limit):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute(
+            "SELECT delivery_id, event, action, issue_number, received_at FROM events "
+            "ORDER BY received_at DESC LIMIT ?", (limit,),
+        ) as cur:
+            return await cur.fetchall()
+
+
+async def timed(label, n, calls):
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(call):
+        async with sem:
+            await call()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(c) for c in calls))
+    elapsed = time.perf_counter() - t0
+    print(f"{label:28s} {n / elapsed:9.0f} /s   ({elapsed * 1000:7.0f} ms for {n})")
+
+
+async def bench_store(name, store, rows, queries):
+    await store.init()
+    try:
+        half = len(rows) // 2
+        await timed(f"{name} insert", half, [lambda r=r: store.insert_event(r) for r in rows[:half]])
+        t0 = time.perf_counter()
+        rest = rows[half:]
+        for i in range(0, len(rest), 500):
+            await store.insert_events(rest[i:i + 500])
+        elapsed = time.perf_counter() - t0
+        print(f"{name + ' bulk insert':28s} {len(rest) / elapsed:9.0f} /s   ({elapsed * 1000:7.0f} ms for {len(rest)})")
+        await timed(f"{name} list_recent_events", queries, [lambda: store.list_recent_events(20)] * queries)
+    finally:
+        await store.aclose()
+
+
+async def main(n: int, postgres: str):
+    processors.load_builtin_handlers()
+    rows = make_events(n)
+    queries = n
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.db")
+        async with aiosqlite.connect(old_path) as db:
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.executescript(SQLITE_CREATE_SQL)
+            for sql in processors.schemas():
+                await db.executescript(sql)
+            await db.commit()
+        half = n // 2
+        await timed("sqlite (old) insert", half, [lambda r=r: old_insert(old_path, r) for r in rows[:half]])
+        await timed("sqlite (old) list_recent_events", queries, [lambda: old_query(old_path, 20)] * queries)
+
+        new_path = os.path.join(tmp, "new.db")
+        await bench_store("sqlite", SQLiteEventStore(lambda: new_path), rows, queries)
+
+        if postgres:
+            local_path = os.path.join(tmp, "local.db")
+            store = PostgresEventStore(postgres, SQLiteEventStore(lambda: local_path), pool_size=CONCURRENCY)
+            await bench_store("postgres", store, make_events(n), queries)
+    await get_container().aclose()  # cache invalidation opened the shared backend
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("events", type=int, nargs="?", default=4000)
+    parser.add_argument("--postgres", default=os.getenv("EVENT_STORE_URL", ""))
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.postgres))
@@ -0,0 +1,111 @@
+# benchmarks/bench_list_memory.py
+# Peak Python heap while serving many concurrent GET /issues requests for a
+# page of large issues:
+#   buffered -> the normal path (whole upstream body read, decoded, normalized,
+#               serialized, then sent)
+#   stream   -> ?stream=true (upstream parsed item by item, written out as it goes)
+# GitHub is stubbed with respx and answers in 16 KiB chunks; the cache is off
+# so every request goes upstream. The app is driven over raw ASGI with a
+# `send` that drops body chunks, so only gateway memory is measured (httpx's
+# ASGITransport would buffer every response body on the client side).
+#
+# Usage (from project root):
+#   PYTHONPATH=$PWD python benchmarks/bench_list_memory.py [concurrency] [body_kb]
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import httpx
+import respx
+
+for k, v in {"GITHUB_TOKEN": "x", "GITHUB_OWNER": "o", "GITHUB_REPO": "r", "WEBHOOK_SECRET": "s",
+             "ISSUE_CACHE_TTL": "0"}.items():
+    os.environ.setdefault(k, v)
+
+from src.deps import get_container  # noqa: E402
+from src.main import app  # noqa: E402
+
+CHUNK = 16 * 1024
+
+
+def make_page(body_kb: int) -> bytes:
+    return json.dumps([
+        {
+            "number": n,
+            "html_url": f"https://github.com/o/r/issues/{n}",
+            "state": "open",
+            "title": f"Issue number {n}: something is broken",
+            "body": "x" * (body_kb * 1024),
+            "labels": [{"id": n, "name": "bug", "color": "d73a4a", "default": True}],
+            "user": {"login": "someone", "id": 1, "avatar_url": "https://example.com/a.png"},
+            "created_at": "2024-09-01T12:34:56Z",
+            "updated_at": "2024-09-01T12:34:56Z",
+        }
+        for n in range(1, 101)
+    ]).encode()
+
+
+async def call(query: bytes) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/issues", "raw_path": b"/issues", "query_string": query,
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    sent = 0
+    done = asyncio.Event()
+
+    async def receive():
+        if not done.is_set():
+            done.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # never disconnects
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return sent
+
+
+async def run(query: bytes, concurrency: int):
+    gc.collect()  # leftovers of the previous run would hide this run's allocations
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    sizes = await asyncio.gather(*(call(query) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] - base
+    return peak, elapsed, sizes[0]
+
+
+async def main(concurrency: int, body_kb: int):
+    page = make_page(body_kb)
+
+    async def chunks():
+        for i in range(0, len(page), CHUNK):
+            yield page[i:i + CHUNK]
+            await asyncio.sleep(0)  # let the other requests interleave, like a real socket
+
+    with respx.mock:
+        respx.get(f"https://api.github.com{get_container().repo_path}/issues").mock(
+            side_effect=lambda request: httpx.Response(200, content=chunks())
+        )
+        await call(b"per_page=100")  # warm up imports / clients
+        await call(b"per_page=100&stream=true")
+        tracemalloc.start()
+        print(f"upstream page {len(page) / 1e6:.1f} MB, {concurrency} concurrent requests")
+        for name, query in (("buffered", b"per_page=100"), ("stream", b"per_page=100&stream=true")):
+            peak, elapsed, size = await run(query, concurrency)
+            print(f"{name:9s} peak {peak / 1e6:8.1f} MB  {elapsed * 1000:7.0f} ms  response {size / 1e6:.1f} MB")
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(args + [50, 20][len(args):])))
@@ -0,0 +1,83 @@
+# benchmarks/bench_overload.py
+# Latency of GET /issues/{number} when requests arrive faster than "GitHub"
+# can answer them, with admission control on and off.
+# The stubbed GitHub slows down as more calls are in flight (50 ms each up to
+# 10 concurrent calls, then proportionally slower -> ~200 req/s at best), and
+# the issue cache is off. Requests arrive open-loop at a fixed rate.
+#   off -> every request is admitted; the backlog and latency keep growing
+#   on  -> excess requests get 429/503 quickly, admitted ones stay fast
+#
+# Usage (from project root):
+#   PYTHONPATH=$PWD python benchmarks/bench_overload.py [rate_per_s] [seconds]
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+for k, v in {"GITHUB_TOKEN": "x", "GITHUB_OWNER": "o", "GITHUB_REPO": "r", "WEBHOOK_SECRET": "s",
+             "ISSUE_CACHE_TTL": "0"}.items():
+    os.environ.setdefault(k, v)
+
+from src import admission  # noqa: E402
+from src import github_client as gh  # noqa: E402
+from src.deps import get_container  # noqa: E402
+from src.main import app  # noqa: E402
+
+inflight = 0
+
+
+async def fake_request(method, url, **kwargs):
+    global inflight
+    inflight += 1
+    start = time.monotonic()
+    try:
+        await asyncio.sleep(0.05 * max(1.0, inflight / 10))
+    finally:
+        inflight -= 1
+    admission.record_upstream(time.monotonic() - start, congested=False)
+    number = int(url.rsplit("/", 1)[1])
+    return httpx.Response(200, json={
+        "number": number, "html_url": "h", "state": "open", "title": "t", "body": None,
+        "labels": [], "created_at": "c", "updated_at": "u",
+    }, request=httpx.Request(method, "https://api.github.com" + url))
+
+
+gh._request = fake_request
+
+
+async def load(client: httpx.AsyncClient, rate: int, seconds: float):
+    async def one(i):
+        t0 = time.perf_counter()
+        resp = await client.get(f"/issues/{i + 1}")
+        return resp.status_code, time.perf_counter() - t0
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        # open loop: arrivals don't wait for earlier responses
+        await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(one(i)))
+    results = await asyncio.gather(*tasks)
+    ok = sorted(t for status, t in results if status == 200)
+    shed = sum(1 for status, _ in results if status in (429, 503))
+    return ok, shed
+
+
+async def main(rate: int, seconds: float):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for enabled in (False, True):
+            get_container().settings.ADMISSION_ENABLED = enabled
+            admission.limiters.clear()
+            await load(client, 20, 0.5)  # warm up (and let the limiter find its baseline)
+            ok, shed = await load(client, rate, seconds)
+            p99 = ok[int(len(ok) * 0.99) - 1] if ok else 0
+            print(f"admission {'on ' if enabled else 'off'}  ok {len(ok):4d}  shed {shed:4d}  "
+                  f"p50 {statistics.median(ok) * 1000:7.0f} ms  p99 {p99 * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(int(args[0]) if args else 400, float(args[1]) if len(args) > 1 else 5.0))
@@ -0,0 +1,100 @@
+# benchmarks/bench_responses.py
+# Per-request CPU for GET /issues with a 100-issue page:
+#   before -> handler returns dicts, FastAPI validates them against
+#             response_model=List[Issue] and re-encodes (old code path)
+#   after  -> the real route: one-pass TypeAdapter serialization (serializers.py)
+# GitHub is stubbed out, so only gateway CPU is measured (the real app also
+# runs its request-id middleware, which the "before" app does not).
+#
+# Usage (from project root):
+#   PYTHONPATH=$PWD python benchmarks/bench_responses.py [requests]
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI, Response
+
+for k, v in {"GITHUB_TOKEN": "x", "GITHUB_OWNER": "o", "GITHUB_REPO": "r", "WEBHOOK_SECRET": "s"}.items():
+    os.environ.setdefault(k, v)
+
+from src import github_client as gh  # noqa: E402
+from src.main import app as new_app  # noqa: E402
+from src.models import Issue  # noqa: E402
+from src.serializers import ISSUE_LIST  # noqa: E402
+
+PAGE = [
+    {
+        "number": n,
+        "html_url": f"https://github.com/o/r/issues/{n}",
+        "state": "open",
+        "title": f"Issue number {n}: something is broken",
+        "body": "Steps to reproduce...\n" * 100,
+        "labels": [{"name": "bug"}, {"name": "frontend"}, {"name": "p2"}],
+        "created_at": "2024-09-01T12:34:56Z",
+        "updated_at": "2024-09-01T12:34:56Z",
+    }
+    for n in range(1, 101)
+]
+
+
+async def fake_list_issues(state, labels, page, per_page):
+    return PAGE, {"link": '<https://api.github.com/x?page=2>; rel="next"'}
+
+gh.list_issues = fake_list_issues
+
+# the old handler shape: dicts out, response_model validation + jsonable_encoder
+old_app = FastAPI()
+
+
+@old_app.get("/issues", response_model=List[Issue])
+async def old_list_issues(response: Response):
+    issues, headers = await gh.list_issues("open", None, 1, 100)
+    response.headers["Link"] = headers["link"]
+    return issues
+
+
+async def cpu_per_request(app, n: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://b") as client:
+        for _ in range(20):  # warm-up
+            await client.get("/issues?per_page=100")
+        start = time.process_time()
+        for _ in range(n):
+            resp = await client.get("/issues?per_page=100")
+            assert resp.status_code == 200 and len(resp.json()) == 100
+        # subtract client-side parsing so mostly the gateway is counted
+        parse_start = time.process_time()
+        for _ in range(n):
+            httpx.Response(200, content=resp.content).json()
+        parse = time.process_time() - parse_start
+        return (time.process_time() - start - parse) / n * 1e6
+
+
+def micro(n: int):
+    start = time.process_time()
+    for _ in range(n):
+        Response(content=httpx.Response(200, json=[Issue(**i).model_dump() for i in PAGE]).content)
+    before = (time.process_time() - start) / n * 1e6
+    start = time.process_time()
+    for _ in range(n):
+        ISSUE_LIST.dump_json(PAGE)
+    after = (time.process_time() - start) / n * 1e6
+    return before, after
+
+
+async def main(n: int):
+    before = await cpu_per_request(old_app, n)
+    after = await cpu_per_request(new_app, n)
+    print(f"GET /issues (100 issues), {n} requests, CPU per request:")
+    print(f"  before (response_model validation): {before:9.1f} us")
+    print(f"  after  (TypeAdapter fast path):     {after:9.1f} us   ({before / after:.1f}x)")
+    mb, ma = micro(n)
+    print("serialization only (100 issues):")
+    print(f"  model per item + json.dumps:        {mb:9.1f} us")
+    print(f"  ISSUE_LIST.dump_json:               {ma:9.1f} us   ({mb / ma:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
@@ -0,0 +1,21 @@
+# scripts/backfill_search.py
+# Fill the full-text search index (events.db) from GitHub.
+# Usage (from project root):
+#   PYTHONPATH=$PWD python scripts/backfill_search.py [--no-comments]
+import asyncio
+import sys
+
+from src import storage, search  # settings (.env) are loaded on first GitHub call
+
+
+async def main(include_comments: bool):
+    try:
+        await storage.init_db()
+        counts = await search.backfill(include_comments=include_comments)
+    finally:
+        await storage.close_db()
+    print(f"[SUCCESS] Indexed {counts['issues']} issue(s) and {counts['comments']} comment(s).")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(include_comments="--no-comments" not in sys.argv[1:]))
@@ -0,0 +1,60 @@
+# scripts/snapshot.py
+# Warm the local store (events.db) without waiting for webhooks.
+# Usage (from project root):
+#   PYTHONPATH=$PWD python scripts/snapshot.py backfill [--comments] [--concurrency 4] [--restart]
+#   PYTHONPATH=$PWD python scripts/snapshot.py export snapshot.jsonl.gz
+#   PYTHONPATH=$PWD python scripts/snapshot.py import snapshot.jsonl.gz
+import argparse
+import asyncio
+import os
+import sys
+
+# a one-off bulk job gains nothing from the response cache -> keep memory flat
+os.environ.setdefault("ISSUE_CACHE_TTL", "0")
+
+from src import snapshot, storage  # noqa: E402
+
+
+async def main(args) -> int:
+    try:
+        return await run(args)
+    finally:
+        await storage.close_db()
+
+
+async def run(args) -> int:
+    await storage.init_db()
+    if args.cmd == "backfill":
+        totals = await snapshot.backfill(
+            with_comments=args.comments,
+            concurrency=args.concurrency,
+            per_page=args.per_page,
+            restart=args.restart,
+        )
+        print(f"[SUCCESS] Loaded {totals['issues']} issue(s), {totals['comments']} comment(s) "
+              f"from {totals['pages']} page(s).")
+    elif args.cmd == "export":
+        counts = await snapshot.export_snapshot(args.path)
+        print(f"[SUCCESS] Wrote {args.path}: {counts}")
+    else:
+        counts = await snapshot.import_snapshot(args.path)
+        print(f"[SUCCESS] Loaded {args.path}: {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill / export / import the local issue store")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("backfill", help="fetch all issues from GitHub into the local tables")
+    b.add_argument("--comments", action="store_true", help="also fetch every issue's comments")
+    b.add_argument("--concurrency", type=int, default=4, help="pages (and comment threads) fetched at once")
+    b.add_argument("--per-page", type=int, default=100)
+    b.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    for name, text in (("export", "write a snapshot file"), ("import", "load a snapshot file")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("path")
+    try:
+        sys.exit(asyncio.run(main(parser.parse_args())))
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
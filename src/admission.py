@@ -0,0 +1,204 @@
+# src/admission.py
+# Admission control at the gateway edge: every route gets its own concurrency
+# limit that adapts to the GitHub latency it observes (AIMD), plus a short queue.
+#   - below the limit          -> request runs right away
+#   - at the limit             -> request waits in a FIFO queue, for at most
+#                                 ADMISSION_QUEUE_TIMEOUT seconds
+#   - queue full               -> 429 + Retry-After (shed immediately)
+#   - waited past the deadline -> 503 + Retry-After
+#
+# Limit updates, per GitHub call made while serving the route (github_client
+# reports them through record_upstream; cache hits report nothing):
+#   latency > LATENCY_TOLERANCE x baseline, 5xx or network error -> limit x BACKOFF
+#     (at most once per baseline interval, so one slow burst counts once)
+#   otherwise, while the limit is actually in use -> limit + 1/limit
+# `baseline` follows the fastest recent latencies (drifts up slowly, so it
+# recovers if GitHub gets permanently slower). Routes that never call GitHub
+# keep ADMISSION_INITIAL_LIMIT.
+#
+# Implemented as a plain ASGI middleware so the slot is held until the last
+# body chunk is sent (streamed responses keep their upstream call open).
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional
+
+import structlog
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+
+from .deps import get_container
+
+log = structlog.get_logger()
+
+LATENCY_TOLERANCE = 2.0   # "congested" = this many times slower than the baseline
+BACKOFF = 0.9             # multiplicative decrease
+BASELINE_DRIFT = 0.01     # how fast the baseline follows slower samples
+
+# not limited: health checks must answer under overload, static files never wait on
+# GitHub, and shed webhook deliveries would be lost (GitHub does not redeliver)
+EXCLUDED_PREFIXES = ("/healthz", "/debug/", "/public/", "/docs", "/redoc", "/openapi.json", "/webhook")
+
+
+# route key -> limiter, shared by the middleware and GET /debug/admission
+limiters: Dict[str, "RouteLimiter"] = {}
+_current: ContextVar[Optional["RouteLimiter"]] = ContextVar("admission_limiter", default=None)
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, error: str, message: str, retry_after: int, details: Dict[str, Any]):
+        super().__init__(message)
+        self.status = status
+        self.error = error
+        self.message = message
+        self.retry_after = retry_after
+        self.details = details
+
+
+class RouteLimiter:
+    def __init__(self, route: str, initial: int, min_limit: int, max_limit: int,
+                 queue_size: int, queue_timeout: float):
+        self.route = route
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.baseline: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.shed = 0
+
+    def _retry_after(self) -> int:
+        # time for the queue ahead to drain at the current limit
+        per_request = self.baseline or 1.0
+        return max(1, math.ceil(per_request * (len(self._waiters) + 1) / max(self.limit, 1.0)))
+
+    def _reject(self, status: int, error: str, message: str) -> Rejected:
+        self.shed += 1
+        return Rejected(status, error, message, self._retry_after(), {
+            "route": self.route, "limit": int(self.limit),
+            "inflight": self.inflight, "queued": len(self._waiters),
+        })
+
+    async def acquire(self):
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject(429, "TooManyRequests", "Gateway is at capacity for this route, retry later")
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            # the releaser hands its slot over (inflight already counted for us)
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject(503, "Overloaded", "Request waited too long for a free slot")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # slot was granted as the client went away
+            raise
+        finally:
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self):
+        self.inflight -= 1
+        while self._waiters and self.inflight < int(self.limit):
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.inflight += 1
+                fut.set_result(None)
+
+    def observe(self, latency: float, congested: bool):
+        now = time.monotonic()
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * BASELINE_DRIFT
+        if congested or latency > self.baseline * LATENCY_TOLERANCE:
+            if now - self._last_decrease >= self.baseline:
+                self.limit = max(float(self.min_limit), self.limit * BACKOFF)
+                self._last_decrease = now
+        elif self.inflight >= self.limit / 2:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "baseline_ms": round(self.baseline * 1000, 1) if self.baseline is not None else None,
+            "shed": self.shed,
+        }
+
+
+class AdmissionMiddleware:
+    """Per-route adaptive concurrency limits (keyed by method + route template)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _route_key(self, scope) -> Optional[str]:
+        path = scope["path"]
+        if path.startswith(EXCLUDED_PREFIXES):
+            return None
+        # same template for /issues/1 and /issues/2 -> they share one limit
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return f"{scope['method']} {route.path}"
+        return None  # 404 / 405 answer right away
+
+    def _limiter(self, key: str) -> RouteLimiter:
+        limiter = limiters.get(key)
+        if limiter is None:
+            s = get_container().settings
+            limiter = limiters[key] = RouteLimiter(
+                key, s.ADMISSION_INITIAL_LIMIT, s.ADMISSION_MIN_LIMIT, s.ADMISSION_MAX_LIMIT,
+                s.ADMISSION_QUEUE_SIZE, s.ADMISSION_QUEUE_TIMEOUT,
+            )
+        return limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_container().settings.ADMISSION_ENABLED:
+            return await self.app(scope, receive, send)
+        key = self._route_key(scope)
+        if key is None:
+            return await self.app(scope, receive, send)
+
+        limiter = self._limiter(key)
+        try:
+            await limiter.acquire()
+        except Rejected as e:
+            log.warning("request_shed", route=key, status=e.status, **limiter.as_dict())
+            response = JSONResponse(
+                status_code=e.status,
+                content={"detail": {"error": e.error, "message": e.message, "details": e.details}},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        token = _current.set(limiter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            limiter.release()
+
+
+def record_upstream(latency: float, congested: bool):
+    """Feed one GitHub call's latency to the limiter of the route being served."""
+    limiter = _current.get()
+    if limiter is not None:
+        limiter.observe(latency, congested)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {key: limiter.as_dict() for key, limiter in sorted(limiters.items())}
@@ -0,0 +1,118 @@
+# src/cache.py
+# GitHub read cache on the shared backend (see shared.py), with single-flight:
+#  - in-process: concurrent callers for the same key await one task
+#  - cross-process: one worker takes a short lease and loads, the others
+#    poll the shared cache for its result instead of calling GitHub too
+# Invalidated by our own writes and by `issues` / `issue_comment` webhooks.
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from . import processors
+from .deps import get_container
+
+LEASE_TTL = 10.0      # seconds a loader may hold the lease
+POLL_INTERVAL = 0.025
+
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _prefix() -> str:
+    s = get_container().settings
+    return f"{s.GITHUB_OWNER}/{s.GITHUB_REPO}"
+
+
+def issue_key(number: int) -> str:
+    return f"{_prefix()}:issue:{number}"
+
+
+# list pages can't be invalidated one by one -> a generation counter is part
+# of every list key; bumping it orphans all cached pages at once
+async def list_key(*parts: Any) -> str:
+    gen = await get_container().shared().get(f"{_prefix()}:issues:gen") or "0"
+    return f"{_prefix()}:issues:{gen}:" + ":".join(str(p) for p in parts)
+
+
+# comments are cached per issue -> a per-issue generation counter
+async def comments_key(number: int, *parts: Any) -> str:
+    gen = await get_container().shared().get(f"{_prefix()}:comments:{number}:gen") or "0"
+    return f"{_prefix()}:comments:{number}:{gen}:" + ":".join(str(p) for p in parts)
+
+
+async def invalidate_comments(number: int):
+    await get_container().shared().incr(f"{_prefix()}:comments:{number}:gen")
+
+
+async def invalidate_issue(number: Optional[int] = None):
+    shared = get_container().shared()
+    if number is not None:
+        await shared.delete(issue_key(number))
+    await shared.incr(f"{_prefix()}:issues:gen")
+
+
+async def cached(key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+    """
+    Return the cached JSON value for key, or run loader() once (across
+    coroutines and worker processes) and cache its result for ttl seconds.
+    """
+    ttl = get_container().settings.ISSUE_CACHE_TTL if ttl is None else ttl
+    if ttl <= 0:
+        return await loader()
+    shared = get_container().shared()
+    hit = await shared.get(key)
+    if hit is not None:
+        return json.loads(hit)
+
+    running = _inflight.get(key)
+    if running is not None:
+        return await asyncio.shield(running)
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        value = await _load_once(shared, key, loader, ttl)
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved -> no warning when nobody else was waiting
+        raise
+    else:
+        fut.set_result(value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _load_once(shared, key: str, loader, ttl: float) -> Any:
+    lease = f"lease:{key}"
+    deadline = time.monotonic() + LEASE_TTL
+    while not await shared.add(lease, "1", LEASE_TTL):
+        # another worker is loading -> wait for its result
+        await asyncio.sleep(POLL_INTERVAL)
+        hit = await shared.get(key)
+        if hit is not None:
+            return json.loads(hit)
+        if time.monotonic() > deadline:
+            break  # holder died or is stuck -> load ourselves
+    try:
+        value = await loader()
+        await shared.set(key, json.dumps(value), ttl)
+        return value
+    finally:
+        await shared.delete(lease)
+
+
+# issues.* webhooks -> drop the cached issue and every cached list page
+@processors.on("issues", derived=False)
+async def invalidate_on_issue_event(db, payload: Dict[str, Any]):
+    number = (payload.get("issue") or {}).get("number")
+    await invalidate_issue(number)
+
+
+# issue_comment.* webhooks -> drop that issue's cached comment pages
+@processors.on("issue_comment", derived=False)
+async def invalidate_on_comment_event(db, payload: Dict[str, Any]):
+    number = (payload.get("issue") or {}).get("number")
+    if number is not None:
+        await invalidate_comments(number)
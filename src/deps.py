@@ -0,0 +1,84 @@
+# src/deps.py
+# Lazily built, process-wide dependencies (settings, shared GitHub client,
+# shared key/value backend, event store).
+# Nothing here runs at import time: the first request (or startup hook) that
+# needs a dependency builds it, later calls reuse it. Wired into routes via
+# FastAPI's Depends(...).
+
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+
+from .config import Settings, get_settings
+from .event_store import EventStore, make_event_store
+from .shared import SharedBackend, make_backend
+
+GITHUB_API = "https://api.github.com"
+
+
+class Container:
+    """Holds dependencies that are expensive to build or should be shared."""
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._shared: Optional[SharedBackend] = None
+        self._events: Optional[EventStore] = None
+
+    @property
+    def settings(self) -> Settings:
+        return get_settings()
+
+    @property
+    def repo_path(self) -> str:
+        s = self.settings
+        return f"/repos/{s.GITHUB_OWNER}/{s.GITHUB_REPO}"
+
+    # shared client -> connection pooling/keep-alive across requests
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=GITHUB_API,
+                headers={
+                    "Accept": "application/vnd.github+json",
+                    "Authorization": f"Bearer {self.settings.GITHUB_TOKEN}",
+                    "User-Agent": "issues-gw/1.0",
+                },
+                timeout=20,
+            )
+        return self._http
+
+    # cross-process key/value store (cache, leases, rate-limit budget)
+    def shared(self) -> SharedBackend:
+        if self._shared is None:
+            s = self.settings
+            self._shared = make_backend(s.SHARED_BACKEND, s.SHARED_DB_PATH, s.REDIS_URL)
+        return self._shared
+
+    # raw webhook event store (+ local SQLite for derived tables), pooled connections
+    def events(self) -> EventStore:
+        if self._events is None:
+            from . import storage  # storage imports this module
+
+            s = self.settings
+            self._events = make_event_store(
+                s.EVENT_STORE, lambda: storage.DB_PATH, s.EVENT_STORE_URL, s.EVENT_STORE_POOL_SIZE
+            )
+        return self._events
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._shared is not None:
+            await self._shared.aclose()
+            self._shared = None
+        if self._events is not None:
+            await self._events.aclose()
+            self._events = None
+
+
+@lru_cache(maxsize=1)
+def get_container() -> Container:
+    return Container()
+
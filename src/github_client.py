@@ -1,20 +1,24 @@
 ### Coded by - Soham Jain - SJSUID- 019139796 ###
 # src/github_client.py
+import time
 import httpx
-from typing import Any, Dict, List, Optional, Tuple
-from .config import get_settings
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from .deps import get_container
+from . import admission, cache, ratelimit
+from .jsonstream import iter_json_array
+from .pagination import forward_pagination_headers, has_next_page
 
-settings = get_settings()
+# settings, headers and the HTTP client are built on first use (see deps.py),
+# so importing this module does no I/O and needs no env vars
 
-BASE = "https://api.github.com"
-OWNER = settings.GITHUB_OWNER
-REPO = settings.GITHUB_REPO
 
-HEADERS = {
-    "Accept": "application/vnd.github+json",
-    "Authorization": f"Bearer {settings.GITHUB_TOKEN}",
-    "User-Agent": "issues-gw/1.0",
-}
+def _client() -> httpx.AsyncClient:
+    return get_container().http()
+
+
+def _repo() -> str:
+    return get_container().repo_path
+
 
 class GitHubError(Exception):
     """Custom error so we can map GitHub problems to our API responses."""
@@ -37,6 +41,54 @@ def _normalize_issue(gh_issue: Dict[str, Any]) -> Dict[str, Any]:
         "updated_at": gh_issue["updated_at"],
     }
 
+def _normalize_comment(gh_comment: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": gh_comment["id"],
+        "body": gh_comment.get("body") or "",
+        "user": gh_comment.get("user") or {},
+        "created_at": gh_comment["created_at"],
+        "html_url": gh_comment["html_url"],
+    }
+
+# every GitHub call goes through here -> shared rate-limit budget is charged/updated
+async def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    try:
+        await ratelimit.acquire()
+    except ratelimit.BudgetExhausted as e:
+        raise GitHubError(429, str(e), {"github_status": 429, "retry_after": e.retry_after})
+    start = time.monotonic()
+    try:
+        resp = await _client().request(method, url, **kwargs)
+    except httpx.TransportError:
+        admission.record_upstream(time.monotonic() - start, congested=True)
+        raise
+    admission.record_upstream(time.monotonic() - start, congested=resp.status_code >= 500)
+    await ratelimit.observe(resp.headers)
+    return resp
+
+# same, but the body is left unread (caller iterates it and must close the response)
+async def _request_stream(method: str, url: str, **kwargs) -> httpx.Response:
+    try:
+        await ratelimit.acquire()
+    except ratelimit.BudgetExhausted as e:
+        raise GitHubError(429, str(e), {"github_status": 429, "retry_after": e.retry_after})
+    client = _client()
+    start = time.monotonic()
+    try:
+        resp = await client.send(client.build_request(method, url, **kwargs), stream=True)
+    except httpx.TransportError:
+        admission.record_upstream(time.monotonic() - start, congested=True)
+        raise
+    # time to headers (the body is read as the client consumes it)
+    admission.record_upstream(time.monotonic() - start, congested=resp.status_code >= 500)
+    await ratelimit.observe(resp.headers)
+    if resp.is_error:
+        try:
+            await resp.aread()  # error bodies are small
+        finally:
+            await resp.aclose()
+    return resp
+
 async def _raise_if_error(resp: httpx.Response):
     if resp.is_error:
         try:
@@ -53,29 +105,61 @@ async def create_issue(title: str, body: Optional[str], labels: Optional[List[st
         payload["body"] = body
     if labels:
         payload["labels"] = labels
-    async with httpx.AsyncClient(base_url=BASE, headers=HEADERS, timeout=20) as client:
-        resp = await client.post(f"/repos/{OWNER}/{REPO}/issues", json=payload)
-        await _raise_if_error(resp)
-        return _normalize_issue(resp.json())
+    resp = await _request("POST", f"{_repo()}/issues", json=payload)
+    await _raise_if_error(resp)
+    await cache.invalidate_issue()
+    return _normalize_issue(resp.json())
 
 async def list_issues(state: str, labels: Optional[str], page: int, per_page: int) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
     params = {"state": state, "page": page, "per_page": per_page}
     if labels:
         params["labels"] = labels
-    async with httpx.AsyncClient(base_url=BASE, headers=HEADERS, timeout=20) as client:
-        resp = await client.get(f"/repos/{OWNER}/{REPO}/issues", params=params)
+
+    async def load():
+        resp = await _request("GET", f"{_repo()}/issues", params=params)
         await _raise_if_error(resp)
         # Filter out PRs (GitHub mixes PRs in the issues list; PR items have "pull_request" key)
         issues = [_normalize_issue(x) for x in resp.json() if "pull_request" not in x]
-        return issues, dict(resp.headers)
+        return {"issues": issues, "headers": forward_pagination_headers(resp.headers)}
+
+    # cached + single-flight across workers (only the forwarded headers are kept)
+    found = await cache.cached(await cache.list_key(state, labels or "", page, per_page), load)
+    return found["issues"], found["headers"]
+
+
+async def stream_issues(
+    state: str, labels: Optional[str], page: int, per_page: int
+) -> Tuple[AsyncIterator[Dict[str, Any]], Dict[str, str]]:
+    """
+    Uncached list_issues that never holds the whole page in memory.
+    -> upstream errors are raised here, before any item is read
+    -> items are parsed, filtered and normalized one at a time as bytes arrive
+    """
+    params = {"state": state, "page": page, "per_page": per_page}
+    if labels:
+        params["labels"] = labels
+    resp = await _request_stream("GET", f"{_repo()}/issues", params=params)
+    await _raise_if_error(resp)
+
+    async def items():
+        try:
+            async for x in iter_json_array(resp.aiter_bytes()):
+                if "pull_request" not in x:
+                    yield _normalize_issue(x)
+        finally:
+            await resp.aclose()
+
+    return items(), forward_pagination_headers(resp.headers)
 
 
 async def get_issue(number: int) -> Dict[str, Any]:
-    async with httpx.AsyncClient(base_url=BASE, headers=HEADERS, timeout=20) as client:
-        resp = await client.get(f"/repos/{OWNER}/{REPO}/issues/{number}")
+    async def load():
+        resp = await _request("GET", f"{_repo()}/issues/{number}")
         await _raise_if_error(resp)
         return _normalize_issue(resp.json())
 
+    return await cache.cached(cache.issue_key(number), load)
+
 async def update_issue(number: int, title: Optional[str], body: Optional[str], state: Optional[str]) -> Dict[str, Any]:
     payload: Dict[str, Any] = {}
     if title is not None:
@@ -84,15 +168,39 @@ async def update_issue(number: int, title: Optional[str], body: Optional[str], s
         payload["body"] = body
     if state is not None:
         payload["state"] = state  # "open" or "closed"
-    async with httpx.AsyncClient(base_url=BASE, headers=HEADERS, timeout=20) as client:
-        resp = await client.patch(f"/repos/{OWNER}/{REPO}/issues/{number}", json=payload)
-        await _raise_if_error(resp)
-        return _normalize_issue(resp.json())
+    resp = await _request("PATCH", f"{_repo()}/issues/{number}", json=payload)
+    await _raise_if_error(resp)
+    await cache.invalidate_issue(number)
+    return _normalize_issue(resp.json())
     
 async def create_comment(number: int, body: str) -> Dict[str, Any]:
     payload = {"body": body}
-    async with httpx.AsyncClient(base_url=BASE, headers=HEADERS, timeout=20) as client:
-        resp = await client.post(f"/repos/{OWNER}/{REPO}/issues/{number}/comments", json=payload)
+    resp = await _request("POST", f"{_repo()}/issues/{number}/comments", json=payload)
+    await _raise_if_error(resp)
+    await cache.invalidate_comments(number)
+    return _normalize_comment(resp.json())
+
+
+async def list_comments(number: int, page: int, per_page: int) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    params = {"page": page, "per_page": per_page}
+
+    async def load():
+        resp = await _request("GET", f"{_repo()}/issues/{number}/comments", params=params)
         await _raise_if_error(resp)
-        return resp.json()
+        comments = [_normalize_comment(c) for c in resp.json()]
+        return {"comments": comments, "headers": forward_pagination_headers(resp.headers)}
+
+    # cached per issue; issue_comment webhooks + create_comment invalidate it
+    found = await cache.cached(await cache.comments_key(number, page, per_page), load)
+    return found["comments"], found["headers"]
+
 
+async def iter_comments(number: int, per_page: int = 100, start_page: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield every page of comments for an issue, following Link rel="next"."""
+    page = start_page
+    while True:
+        comments, headers = await list_comments(number, page, per_page)
+        yield comments
+        if not has_next_page(headers):
+            return
+        page += 1
@@ -0,0 +1,182 @@
+# src/http_cache.py
+# Conditional responses and compression towards our own clients.
+#  - strong ETags computed from a fingerprint of the data instead of from the
+#    serialized bytes; the fingerprint holds every field the serializer renders
+#    (all IssueDict fields, the event rows), so equal tags mean equal bodies
+#  - If-None-Match hit -> 304 without serializing anything
+#  - miss -> body bytes reused from a small LRU keyed by the ETag, so a page
+#    that hasn't changed is not serialized again either
+#  - GZip for large responses (GZIP_MIN_SIZE); a gzipped body gets the tag
+#    "<etag>-gzip" so each encoding keeps its own strong validator
+#  - StaticFiles with content-hash ETags (instead of mtime/size)
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware as _GZipMiddleware
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from .deps import get_container
+from .serializers import IssueDict
+
+# bump when a serializer's output changes, so old tags stop matching
+FINGERPRINT_VERSION = 2
+# exactly what ISSUE / ISSUE_LIST render
+ISSUE_FIELDS = tuple(IssueDict.__annotations__)
+GZIP_SUFFIX = "-gzip"
+BODY_CACHE_BYTES = 8 * 1024 * 1024
+
+_bodies: "OrderedDict[str, bytes]" = OrderedDict()
+_body_bytes = 0
+
+
+def make_etag(kind: str, parts: Any) -> str:
+    raw = json.dumps([FINGERPRINT_VERSION, kind, parts], separators=(",", ":"), default=str)
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
+
+def _issue_parts(issue: Mapping[str, Any]) -> list:
+    # every rendered field: updated_at has 1 s resolution, so an edit within the
+    # same second must still change the tag (and miss the body cache)
+    return [[l["name"] for l in issue["labels"]] if f == "labels" else issue.get(f) for f in ISSUE_FIELDS]
+
+
+def issue_etag(issue: Mapping[str, Any]) -> str:
+    return make_etag("issue", _issue_parts(issue))
+
+
+# kind keeps GitHub pages and local-index pages apart (their bodies may differ)
+def issues_etag(issues: Iterable[Mapping[str, Any]], kind: str = "issues") -> str:
+    return make_etag(kind, [_issue_parts(i) for i in issues])
+
+
+def _opaque(tag: str) -> str:
+    # W/"x" and "x-gzip" validate the same data as "x"
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    if tag.endswith(GZIP_SUFFIX + '"'):
+        tag = tag[: -len(GZIP_SUFFIX) - 1] + '"'
+    return tag
+
+
+def matching_tag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The client's tag that matches `etag` (weak comparison, as for If-None-Match)."""
+    for tag in (if_none_match or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        if tag and _opaque(tag) == etag:
+            return tag
+    return None
+
+
+def _cached_body(etag: str, render: Callable[[], bytes]) -> bytes:
+    global _body_bytes
+    body = _bodies.get(etag)
+    if body is not None:
+        _bodies.move_to_end(etag)
+        return body
+    body = render()
+    if len(body) <= BODY_CACHE_BYTES // 4:
+        _bodies[etag] = body
+        _body_bytes += len(body)
+        while _body_bytes > BODY_CACHE_BYTES:
+            _, old = _bodies.popitem(last=False)
+            _body_bytes -= len(old)
+    return body
+
+
+def conditional_json(
+    request: Request,
+    adapter: TypeAdapter,
+    data: Any,
+    etag: str,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    200 JSON response tagged with `etag`, or 304 if the client already has it.
+    -> the body is serialized at most once per ETag (LRU)
+    """
+    out: Dict[str, str] = dict(headers) if headers else {}
+    matched = matching_tag(request.headers.get("if-none-match"), etag)
+    if matched is not None:
+        # echo the client's form of the tag (it may carry the -gzip suffix)
+        out["ETag"] = matched
+        return Response(status_code=304, headers=out)
+    out["ETag"] = etag
+    return Response(
+        content=_cached_body(etag, lambda: adapter.dump_json(data)),
+        headers=out,
+        media_type="application/json",
+    )
+
+
+class GZipMiddleware(_GZipMiddleware):
+    """
+    Starlette's GZip, but a compressed body gets its own strong ETag.
+    -> GZIP_MIN_SIZE / GZIP_LEVEL are read on the first request (settings are lazy)
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._configured = False
+
+    async def __call__(self, scope, receive, send):
+        if not self._configured:
+            s = get_container().settings
+            self.minimum_size, self.compresslevel = s.GZIP_MIN_SIZE, s.GZIP_LEVEL
+            self._configured = True
+        if scope["type"] != "http" or self.compresslevel == 0:
+            return await self.app(scope, receive, send)
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag", "")
+                if headers.get("content-encoding") == "gzip" and etag.endswith('"') \
+                        and not etag.endswith(GZIP_SUFFIX + '"'):
+                    headers["etag"] = etag[:-1] + GZIP_SUFFIX + '"'
+            await send(message)
+
+        await super().__call__(scope, receive, send_with_etag)
+
+
+class HashedStaticFiles(StaticFiles):
+    """StaticFiles whose ETag is a hash of the file content (cached per mtime/size)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hashes: Dict[str, Tuple[Tuple[float, int], str]] = {}
+
+    def _content_etag(self, full_path: str, stat_result: os.stat_result) -> str:
+        key = (stat_result.st_mtime, stat_result.st_size)
+        cached = self._hashes.get(full_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        h = hashlib.blake2b(digest_size=16)
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                h.update(chunk)
+        etag = f'"{h.hexdigest()}"'
+        self._hashes[full_path] = (key, etag)
+        return etag
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        etag = self._content_etag(str(full_path), stat_result)
+        matched = matching_tag(Headers(scope=scope).get("if-none-match"), etag)
+        if matched is not None:
+            return Response(status_code=304, headers={"ETag": matched})
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["etag"] = etag
+        request_headers = Headers(scope=scope)
+        if "if-none-match" not in request_headers and self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)  # If-Modified-Since still works
+        return response
@@ -0,0 +1,291 @@
+# src/issue_index.py
+# Local issue index kept fresh from `issues` webhooks:
+#  - issue_index: one row per issue (normalized fields)
+#  - issue_labels: inverted index label -> issue numbers
+# Used by GET /issues when a boolean label query / text filter is given,
+# so "bug OR regression, NOT wontfix" is one set expression instead of
+# several full list scans against GitHub.
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import aiosqlite
+
+from . import processors, storage
+
+processors.schema("""
+CREATE TABLE IF NOT EXISTS issue_index (
+  number INTEGER PRIMARY KEY,
+  html_url TEXT NOT NULL,
+  state TEXT NOT NULL,
+  title TEXT NOT NULL,
+  body TEXT,
+  labels TEXT NOT NULL DEFAULT '[]',
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issue_index_state ON issue_index (state);
+CREATE TABLE IF NOT EXISTS issue_labels (
+  label TEXT NOT NULL,
+  number INTEGER NOT NULL,
+  PRIMARY KEY (label, number)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_issue_labels_number ON issue_labels (number);
+""")
+
+SORT_COLUMNS = {"created": "created_at", "updated": "updated_at", "number": "number"}
+
+
+class QueryError(ValueError):
+    """Raised for a malformed label expression (mapped to 400 by the route)."""
+
+
+# ======================
+# Webhook -> index
+# ======================
+
+@processors.on("issues")
+async def index_issue(db, payload: Dict[str, Any]):
+    issue = payload.get("issue") or {}
+    number = issue.get("number")
+    if number is None:
+        return
+    await db.execute("DELETE FROM issue_labels WHERE number = ?", (number,))
+    if payload.get("action") == "deleted" or issue.get("pull_request") is not None:
+        await db.execute("DELETE FROM issue_index WHERE number = ?", (number,))
+        return
+
+    labels = [{"name": l["name"]} for l in issue.get("labels") or [] if isinstance(l, dict) and "name" in l]
+    await db.execute(
+        """
+        INSERT INTO issue_index (number, html_url, state, title, body, labels, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(number) DO UPDATE SET
+          html_url = excluded.html_url, state = excluded.state, title = excluded.title,
+          body = excluded.body, labels = excluded.labels,
+          created_at = excluded.created_at, updated_at = excluded.updated_at
+        """,
+        (
+            number,
+            issue.get("html_url") or "",
+            issue.get("state") or "open",
+            issue.get("title") or "",
+            issue.get("body"),
+            json.dumps(labels),
+            issue.get("created_at") or "",
+            issue.get("updated_at") or "",
+        ),
+    )
+    await db.executemany(
+        "INSERT OR IGNORE INTO issue_labels (label, number) VALUES (?, ?)",
+        [(l["name"].lower(), number) for l in labels],
+    )
+
+
+# ======================
+# Label expression parser
+# ======================
+# Grammar (keywords are upper-case, labels are case-insensitive):
+#   query  := expr ("," expr)*
+#   expr   := term (("OR" | "|") term)*
+#   term   := factor (("AND" | "&") factor)*
+#   factor := ("NOT" | "!" | "-") factor | "(" query ")" | label
+#   label  := bare words (joined by single spaces) or a "quoted string"
+# e.g.  bug OR regression, NOT wontfix   ==   (bug OR regression) AND NOT wontfix
+# note: "," is an AND that binds looser than OR (a list of filters);
+#       AND / & bind tighter than OR as usual.
+
+_TOKEN = re.compile(r'\s*(\(|\)|,|\||&|!|"(?:[^"\\]|\\.)*"|[^\s(),|&!"]+)')
+_OPS = {"OR": "|", "AND": "&", "NOT": "!"}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise QueryError(f"unexpected character at position {pos}")
+        tok = m.group(1)
+        pos = m.end()
+        if tok in ("(", ")", "|", "&", "!", ","):
+            tokens.append(("op", tok))
+        elif tok in _OPS:
+            tokens.append(("op", _OPS[tok]))
+        elif tok.startswith('"'):
+            tokens.append(("label", re.sub(r"\\(.)", r"\1", tok[1:-1])))
+        elif tok.startswith("-") and len(tok) > 1 and (not tokens or tokens[-1][0] == "op"):
+            tokens.append(("op", "!"))
+            tokens.append(("word", tok[1:]))
+        else:
+            # consecutive bare words form one label ("good first issue")
+            if tokens and tokens[-1][0] == "word":
+                tokens[-1] = ("word", tokens[-1][1] + " " + tok)
+            else:
+                tokens.append(("word", tok))
+    return [("label", v) if kind == "word" else (kind, v) for kind, v in tokens]
+
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.i = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def take_op(self, op: str) -> bool:
+        if self.peek() == ("op", op):
+            self.i += 1
+            return True
+        return False
+
+    def query(self):
+        parts = [self.expr()]
+        while self.take_op(","):
+            parts.append(self.expr())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def expr(self):
+        parts = [self.term()]
+        while self.take_op("|"):
+            parts.append(self.term())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def term(self):
+        parts = [self.factor()]
+        while self.take_op("&"):
+            parts.append(self.factor())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def factor(self):
+        if self.take_op("!"):
+            return ("not", self.factor())
+        if self.take_op("("):
+            node = self.query()
+            if not self.take_op(")"):
+                raise QueryError("missing ')'")
+            return node
+        tok = self.peek()
+        if tok is None or tok[0] != "label" or not tok[1]:
+            raise QueryError("expected a label" if tok is None else f"unexpected '{tok[1]}'")
+        self.i += 1
+        return ("label", tok[1].lower())
+
+
+def parse_label_query(text: str):
+    """Parse a boolean label expression into a small tuple AST."""
+    tokens = _tokenize(text)
+    if not tokens:
+        raise QueryError("empty label query")
+    parser = _Parser(tokens)
+    node = parser.query()
+    if parser.peek() is not None:
+        raise QueryError(f"unexpected '{parser.peek()[1]}'")
+    return node
+
+
+def _labels_in(node, out: Set[str]) -> Set[str]:
+    kind = node[0]
+    if kind == "label":
+        out.add(node[1])
+    elif kind == "not":
+        _labels_in(node[1], out)
+    else:
+        for child in node[1]:
+            _labels_in(child, out)
+    return out
+
+
+def _evaluate(node, postings: Dict[str, Set[int]], universe: Set[int]) -> Set[int]:
+    kind = node[0]
+    if kind == "label":
+        return postings.get(node[1], set()) & universe
+    if kind == "not":
+        return universe - _evaluate(node[1], postings, universe)
+    sets = [_evaluate(child, postings, universe) for child in node[1]]
+    if kind == "and":
+        sets.sort(key=len)  # intersect smallest first
+        return set.intersection(*sets)
+    return set().union(*sets)
+
+
+# ======================
+# Query
+# ======================
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def query_issues(
+    label_query: Optional[str],
+    text: Optional[str],
+    state: str,
+    sort: str,
+    direction: str,
+    page: int,
+    per_page: int,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Evaluate a label expression + title/body substring + state filter
+    against the local index.
+    -> returns (page of normalized issues, total matches)
+    """
+    ast = parse_label_query(label_query) if label_query else None
+    column = SORT_COLUMNS[sort]
+
+    where, args = [], []
+    if state != "all":
+        where.append("state = ?")
+        args.append(state)
+    if text:
+        where.append("(title LIKE ? ESCAPE '\\' OR body LIKE ? ESCAPE '\\')")
+        pattern = f"%{_like_escape(text)}%"
+        args.extend([pattern, pattern])
+    sql = f"SELECT number, {column} FROM issue_index"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        async with db.execute(sql, args) as cur:
+            keys = dict(await cur.fetchall())
+        matched: Set[int] = set(keys)
+
+        if ast is not None:
+            names = sorted(_labels_in(ast, set()))
+            postings: Dict[str, Set[int]] = {n: set() for n in names}
+            marks = ",".join("?" for _ in names)
+            async with db.execute(
+                f"SELECT label, number FROM issue_labels WHERE label IN ({marks})", names
+            ) as cur:
+                async for label, number in cur:
+                    postings[label].add(number)
+            matched = _evaluate(ast, postings, matched)
+
+        ordered = sorted(matched, key=lambda n: (keys[n], n), reverse=(direction == "desc"))
+        page_numbers = ordered[(page - 1) * per_page: page * per_page]
+        rows: Dict[int, Dict[str, Any]] = {}
+        if page_numbers:
+            marks = ",".join("?" for _ in page_numbers)
+            async with db.execute(
+                f"""
+                SELECT number, html_url, state, title, body, labels, created_at, updated_at
+                FROM issue_index WHERE number IN ({marks})
+                """,
+                page_numbers,
+            ) as cur:
+                async for r in cur:
+                    rows[r[0]] = {
+                        "number": r[0],
+                        "html_url": r[1],
+                        "state": r[2],
+                        "title": r[3],
+                        "body": r[4],
+                        "labels": json.loads(r[5]),
+                        "created_at": r[6],
+                        "updated_at": r[7],
+                    }
+    return [rows[n] for n in page_numbers], len(ordered)
@@ -0,0 +1,75 @@
+# src/jsonstream.py
+# Incremental parser for a top-level JSON array arriving in chunks.
+# Yields each element as soon as it is complete, so the whole upstream body
+# is never held in memory at once (only the element being read plus one
+# network chunk).
+#
+# Elements are decoded with the stdlib's C raw_decode straight from the
+# buffer. An element cut off by the chunk boundary fails to decode; it is only
+# retried once the unread data has doubled, so large elements split over many
+# chunks still cost amortized linear time.
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+_decoder = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+async def _with_eof(chunks: AsyncIterable[bytes]):
+    async for chunk in chunks:
+        yield chunk, False
+    yield b"", True
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    retry_at = 0      # don't try to decode the pending element before len(buf) reaches this
+    state = "start"   # start -> first -> (after -> value ->)* done
+
+    async for chunk, eof in _with_eof(chunks):
+        buf += utf8.decode(chunk, final=eof)
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos == len(buf) or state == "done":
+                break
+            c = buf[pos]
+            if state == "start":
+                if c != "[":
+                    raise JSONStreamError("expected a JSON array")
+                state, pos = "first", pos + 1
+            elif state == "after" or (state == "first" and c == "]"):
+                if c == "]":
+                    state = "done"
+                elif c == "," and state == "after":
+                    state, pos = "value", pos + 1
+                else:
+                    raise JSONStreamError(f"unexpected {c!r} between array items")
+            else:
+                if len(buf) < retry_at and not eof:
+                    break
+                try:
+                    item, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise JSONStreamError(f"truncated JSON array: {e}") from e
+                    retry_at = len(buf) + (len(buf) - pos)  # probably incomplete -> wait for more
+                    break
+                if end == len(buf) and type(item) in (int, float) and not eof:
+                    break  # a number at the very end may continue in the next chunk
+                yield item
+                # drop what was read -> the buffer stays about one element big
+                buf, pos, retry_at, state = buf[end:], 0, 0, "after"
+        if state == "done":
+            return
+
+    if state != "done":
+        raise JSONStreamError("truncated JSON array")
@@ -1,20 +1,30 @@
 ### Coded by - Prachi Gupta SJSU ID- 019106594 ###
 
 # src/main.py
-import uuid
-import structlog
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
-
-from .config import get_settings
-from .routes import issues, webhook
-from .storage import init_db
-
-# load settings
-settings = get_settings()
+# startup report first -> every import below is timed
+from .startup import report
+
+with report.phase("import:framework"):
+    import uuid
+    import structlog
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+    from fastapi.exceptions import RequestValidationError
+    from pathlib import Path
+
+with report.phase("import:app"):
+    from . import admission, replay
+    from .config import get_settings
+    from .deps import get_container
+    from .github_client import GitHubError
+    from .http_cache import GZipMiddleware, HashedStaticFiles
+    from .processors import load_builtin_handlers
+    from .routes import admin, issues, search, stats, webhook, writes
+    from .storage import init_db
+    from . import write_queue
+
+# settings are NOT loaded here anymore -> built lazily (see deps.py),
+# and validated in the startup hook so a bad .env still fails fast
 
 # configure simple logger (INFO level)
 structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(20))
@@ -27,8 +37,18 @@ SPEC_DIR = BASE_DIR / "public"
 # main FastAPI app
 app = FastAPI(title="GitHub Issues Gateway", version="0.1.0")
 
-# serve static files from /public directory
-app.mount("/public", StaticFiles(directory=str(SPEC_DIR)), name="public")
+# serve static files from /public directory (content-hash ETags -> 304 on If-None-Match)
+app.mount("/public", HashedStaticFiles(directory=str(SPEC_DIR)), name="public")
+
+
+# middleware -> per-route adaptive concurrency limit, sheds load with 429/503
+# (added first = runs inside the request-id middleware, so shed responses get an id too)
+app.add_middleware(admission.AdmissionMiddleware)
+
+# middleware -> gzip responses over GZIP_MIN_SIZE. Added before the request-id
+# middleware, so it sees the route's single body chunk (that one re-streams bodies,
+# which would make every response look "streaming" and get compressed)
+app.add_middleware(GZipMiddleware)
 
 
 # middleware -> add unique request id for every request
@@ -54,19 +74,77 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+# central mapping GitHub error -> our error envelope (routes just let it raise)
+#   401/403 -> 401 Unauthorized, 404 -> 404 NotFound, anything else -> 502 GitHubError
+@app.exception_handler(GitHubError)
+async def github_exception_handler(request: Request, exc: GitHubError):
+    headers = None
+    if exc.status in (401, 403):
+        code, err, msg = 401, "Unauthorized", exc.message
+    elif exc.status == 404:
+        code, err = 404, "NotFound"
+        number = request.path_params.get("number")
+        msg = f"Issue {number} not found" if number is not None else "Repo not found or no access"
+    else:
+        code, err, msg = 502, "GitHubError", exc.message
+        if "retry_after" in exc.details:
+            headers = {"Retry-After": str(exc.details["retry_after"])}
+    return JSONResponse(
+        status_code=code,
+        content={"detail": {"error": err, "message": msg, "details": exc.details}},
+        headers=headers,
+    )
+
+
 # simple health check endpoint
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
 
 
-# include routes (issues + webhook)
+# include routes (issues + webhook + derived stats + search + admin)
 app.include_router(issues.router)
 app.include_router(webhook.router)
+app.include_router(stats.router)
+app.include_router(search.router)
+app.include_router(writes.router)
+app.include_router(admin.router)
+
+
+# cold-start breakdown (import + init phases)
+@app.get("/debug/startup")
+async def startup_report():
+    return report.as_dict()
+
+
+# current per-route concurrency limits (admission control)
+@app.get("/debug/admission")
+async def admission_report():
+    return admission.snapshot()
 
 
-# run DB initialization when app starts
+# validate settings + run DB initialization when app starts
 @app.on_event("startup")
 async def _startup():
-    await init_db()
-    log.info("startup_complete")
+    with report.phase("init:settings"):
+        settings = get_settings()
+    if settings.WEB_CONCURRENCY > 1 and settings.SHARED_BACKEND == "memory":
+        log.warning("shared_backend_per_worker", workers=settings.WEB_CONCURRENCY,
+                    hint="set SHARED_BACKEND=sqlite or redis so workers share cache and rate-limit budget")
+    with report.phase("init:handlers"):
+        load_builtin_handlers()
+    with report.phase("init:db"):
+        await init_db()
+        await write_queue.init_queue()
+    if settings.WRITE_WORKERS > 0:
+        write_queue.start_workers(settings.WRITE_WORKERS)
+    report.mark_ready()
+    log.info("startup_complete", **report.as_dict())
+
+
+# close the shared GitHub client (keep-alive connections)
+@app.on_event("shutdown")
+async def _shutdown():
+    await write_queue.stop_workers()
+    await replay.stop()  # resumes from its checkpoint next time
+    await get_container().aclose()
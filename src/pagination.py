@@ -2,7 +2,9 @@
 # Tamizh Selvan (SJSU ID: 019148896)
 # TS: Utilities for forwarding pagination and rate-limit headers.
 
-from typing import Any, Dict
+import math
+import re
+from typing import Any, Dict, Optional
 
 
 #  Case-insensitive header lookup that works for both dict and httpx.Headers.
@@ -28,3 +30,34 @@ def forward_pagination_headers(in_headers: Any) -> Dict[str, str]:
         if v is not None:
             out[k] = v
     return out
+
+
+#  True if upstream Link header advertises a next page.
+def has_next_page(headers: Any) -> bool:
+    return 'rel="next"' in (_get_ci(headers, "Link") or "")
+
+
+#  Page number of upstream rel="last" link (None when there is only one page).
+def last_page(headers: Any) -> Optional[int]:
+    for part in (_get_ci(headers, "Link") or "").split(","):
+        if 'rel="last"' in part:
+            m = re.search(r"[?&]page=(\d+)", part)
+            if m:
+                return int(m.group(1))
+    return None
+
+
+#  Build GitHub-style Link + X-Total-Count headers for results paginated locally.
+def local_pagination_headers(url: Any, page: int, per_page: int, total: int) -> Dict[str, str]:
+    last = max(1, math.ceil(total / per_page))
+    links = []
+    if page < last:
+        links.append(f'<{url.include_query_params(page=page + 1)}>; rel="next"')
+        links.append(f'<{url.include_query_params(page=last)}>; rel="last"')
+    if page > 1:
+        links.append(f'<{url.include_query_params(page=1)}>; rel="first"')
+        links.append(f'<{url.include_query_params(page=min(page - 1, last))}>; rel="prev"')
+    out = {"X-Total-Count": str(total)}
+    if links:
+        out["Link"] = ", ".join(links)
+    return out
@@ -0,0 +1,122 @@
+# src/processors.py
+# Event-processor pipeline that runs behind storage.insert_event.
+# Handlers are registered per (event, action) and derive local state
+# (aggregates, indexes, ...) from webhook payloads.
+
+import importlib
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import structlog
+
+log = structlog.get_logger()
+
+# handler signature -> async def handler(db, payload) -> None
+Handler = Callable[[Any, Dict[str, Any]], Awaitable[None]]
+
+# modules that register built-in handlers (imported once, on first use)
+BUILTIN_MODULES = ("stats", "issue_index", "search", "cache")
+
+# (event, action or None for "any action", derived, handler) in registration order
+_HANDLERS: List[Tuple[str, Optional[str], bool, Handler]] = []
+# extra DDL needed by handlers (derived tables + their indexes)
+_SCHEMAS: List[str] = []
+# cache of resolved handler lists per (event, action, derived filter)
+_DISPATCH: Dict[Tuple[str, str, Optional[bool]], List[Handler]] = {}
+_builtins_loaded = False
+
+
+class HandlerResult(NamedTuple):
+    name: str
+    ok: bool
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+# decorator -> register handler for an event (and optionally one action)
+# derived=False -> a side effect of live events (cache invalidation), not derived
+#                  state: skipped when stored events are replayed
+def on(event: str, action: Optional[str] = None, derived: bool = True):
+    def wrap(fn: Handler) -> Handler:
+        _HANDLERS.append((event, action, derived, fn))
+        _DISPATCH.clear()
+        return fn
+    return wrap
+
+
+# register DDL that init_db should run (tables used by handlers)
+def schema(sql: str) -> None:
+    _SCHEMAS.append(sql)
+
+
+def load_builtin_handlers() -> None:
+    global _builtins_loaded
+    if _builtins_loaded:
+        return
+    _builtins_loaded = True
+    for name in BUILTIN_MODULES:
+        importlib.import_module(f".{name}", __package__)
+
+
+def schemas() -> List[str]:
+    load_builtin_handlers()
+    return list(_SCHEMAS)
+
+
+# names of the derived tables created by schemas() (what a full replay empties)
+def tables() -> List[str]:
+    found = re.findall(r"CREATE\s+(?:VIRTUAL\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", "\n".join(schemas()), re.I)
+    return list(dict.fromkeys(found))
+
+
+# derived: None -> every handler, True / False -> only handlers registered with that flag
+def handlers_for(event: str, action: Optional[str], derived: Optional[bool] = None) -> List[Handler]:
+    load_builtin_handlers()
+    key = (event, action or "", derived)
+    found = _DISPATCH.get(key)
+    if found is None:
+        found = [fn for ev, act, der, fn in _HANDLERS
+                 if ev == event and act in (None, key[1]) and derived in (None, der)]
+        _DISPATCH[key] = found
+    return found
+
+
+async def process_event(
+    db,
+    event: str,
+    action: Optional[str],
+    payload: Dict[str, Any],
+    derived: Optional[bool] = None,
+) -> List[HandlerResult]:
+    """
+    Run every handler registered for (event, action) in order.
+    -> derived=True: derived-state handlers only (replay);
+       derived=False: the others only (live event while a rebuild holds processing)
+    -> each handler runs inside its own SAVEPOINT, so a failing handler
+       only rolls back its own writes and the others still run
+    -> caller owns the transaction (commit happens outside); if none is open
+       one is started here; otherwise the outermost RELEASE of every handler
+       would commit on its own and the caller's rollback could not undo it
+    """
+    if not db.in_transaction:
+        await db.execute("BEGIN")
+    results: List[HandlerResult] = []
+    for fn in handlers_for(event, action, derived):
+        name = getattr(fn, "__qualname__", repr(fn))
+        start = time.perf_counter()
+        await db.execute("SAVEPOINT processor")
+        try:
+            await fn(db, payload)
+        except Exception as e:
+            await db.execute("ROLLBACK TO SAVEPOINT processor")
+            await db.execute("RELEASE SAVEPOINT processor")
+            elapsed = (time.perf_counter() - start) * 1000
+            log.warning("event_handler_failed", handler=name, gh_event=event, action=action, error=repr(e))
+            results.append(HandlerResult(name, False, elapsed, repr(e)))
+            continue
+        await db.execute("RELEASE SAVEPOINT processor")
+        elapsed = (time.perf_counter() - start) * 1000
+        log.debug("event_handler_done", handler=name, gh_event=event, action=action, elapsed_ms=round(elapsed, 3))
+        results.append(HandlerResult(name, True, elapsed))
+    return results
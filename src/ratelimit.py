@@ -0,0 +1,55 @@
+# src/ratelimit.py
+# GitHub rate-limit budget shared by all workers (see shared.py).
+# Every response's X-RateLimit-Remaining/Reset is recorded; every request
+# first takes one unit from the shared counter. When the counter reaches
+# RATE_LIMIT_RESERVE before the window resets, calls are refused locally
+# instead of all workers together running the token dry.
+
+import hashlib
+import time
+from typing import Any, Optional
+
+from .deps import get_container
+from .pagination import _get_ci
+
+
+class BudgetExhausted(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"GitHub rate-limit budget exhausted, resets in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _keys():
+    s = get_container().settings
+    # limits are per token, not per owner/repo; never put the raw token in the shared store
+    token_id = hashlib.sha256(s.GITHUB_TOKEN.encode()).hexdigest()[:16]
+    base = f"ratelimit:{token_id}"
+    return f"{base}:remaining", f"{base}:reset"
+
+
+async def acquire():
+    shared = get_container().shared()
+    remaining_key, reset_key = _keys()
+    reset = await shared.get(reset_key)
+    if reset is None or int(reset) <= time.time():
+        return  # unknown or new window -> GitHub will tell us the new numbers
+    if await shared.decr_if_above(remaining_key, get_container().settings.RATE_LIMIT_RESERVE) is None:
+        raise BudgetExhausted(max(1, int(reset) - int(time.time())))
+
+
+async def observe(headers: Any):
+    remaining: Optional[str] = _get_ci(headers, "X-RateLimit-Remaining")
+    reset: Optional[str] = _get_ci(headers, "X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    shared = get_container().shared()
+    remaining_key, reset_key = _keys()
+    known_reset = await shared.get(reset_key)
+    if known_reset is not None and int(known_reset) == int(reset):
+        # same window: other workers may already have taken more -> only go down
+        known = await shared.get(remaining_key)
+        if known is not None and int(known) <= int(remaining):
+            return
+    else:
+        await shared.set(reset_key, reset)
+    await shared.set(remaining_key, remaining)
@@ -0,0 +1,348 @@
+# src/replay.py
+# Rebuild derived state (stats, label index, search, ...) from the stored
+# webhook events, e.g. after adding a processor or fixing one.
+#  - events are streamed in received_at order (arrival order for ties) from a
+#    cursor over the event store, `batch_size` rows at a time (no fetchall)
+#  - each event goes to one of `workers` partitions by issue number: events of
+#    one issue are applied in order, different issues proceed in parallel
+#  - a partition commits a group of events together with its own checkpoint
+#    (the last event it applied), so an interrupted run resumes exactly where
+#    each partition stopped: nothing skipped, nothing applied twice
+#  - reset=True empties the derived tables first (full rebuild). Until the
+#    replay has caught up, live webhooks are stored but only their side effects
+#    (cache invalidation) run (processing_hold, see event_store.py); the replay
+#    applies them in order after the stored ones, then releases the hold in the
+#    same transaction as the last of them. Otherwise a live "closed" could land
+#    before the replayed "opened" of the same issue.
+#  - cache invalidation handlers (derived=False) don't run for replayed events
+#  - progress + throughput in the log every REPORT_EVERY seconds and in status()
+#    (GET /admin/replay)
+
+import asyncio
+import json
+import time
+import zlib
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from . import processors
+from .deps import get_container
+from .event_store import EventKey, EventRow, EventStore, StoredEvent
+
+log = structlog.get_logger()
+
+REPORT_EVERY = 5.0  # seconds between progress log lines
+
+CHECKPOINT_SQL = """
+CREATE TABLE IF NOT EXISTS replay_jobs (
+  job TEXT PRIMARY KEY,
+  workers INTEGER NOT NULL,
+  reset INTEGER NOT NULL DEFAULT 0,
+  until_received_at TEXT,
+  until_seq INTEGER,
+  done_received_at TEXT,
+  done_seq INTEGER,
+  started_at TEXT DEFAULT (datetime('now')),
+  finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS replay_checkpoint (
+  job TEXT NOT NULL,
+  partition INTEGER NOT NULL,
+  received_at TEXT NOT NULL,
+  seq INTEGER NOT NULL,
+  processed INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (job, partition)
+);
+"""
+
+
+def partition_of(event: StoredEvent, workers: int) -> int:
+    # events without an issue (ping, ...) have no ordering needs -> spread by delivery id
+    issue_number = event[5]
+    key = issue_number if issue_number is not None else zlib.crc32(event[2].encode())
+    return key % workers
+
+
+def _newer(key: Optional[EventKey], than: Optional[EventKey]) -> bool:
+    return key is not None and (than is None or key > than)
+
+
+def _rows(events: List[StoredEvent]) -> List[EventRow]:
+    rows: List[EventRow] = []
+    for received_at, seq, delivery_id, event, action, issue_number, payload in events:
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            log.warning("replay_bad_payload", delivery_id=delivery_id, gh_event=event)
+            continue
+        rows.append((delivery_id, event, action or None, issue_number, payload, data))
+    return rows
+
+
+class Replay:
+    """One replay run; status is readable while it runs (as_dict)."""
+
+    def __init__(self, store: EventStore, job: str = "default", workers: int = 4,
+                 batch_size: int = 1000, reset: bool = False, restart: bool = False):
+        self.store = store
+        self.job = job
+        self.workers = workers
+        self.batch_size = batch_size
+        self.reset = reset
+        self.restart = restart or reset
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.scanned = 0      # rows read from the event store
+        self.processed = 0    # events applied in this run
+        self.resumed = 0      # events applied by earlier, interrupted runs
+        self.position: Optional[EventKey] = None
+        self.until: Optional[EventKey] = None  # end of the current pass
+        self.done: Optional[EventKey] = None   # every event up to here is applied
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._checkpoints: Dict[int, EventKey] = {}
+
+    async def _prepare(self) -> bool:
+        """Create/load the job; False if there is nothing to replay."""
+        local = self.store.derived()
+        async with local.write() as db:
+            await db.executescript(CHECKPOINT_SQL)
+            async with db.execute("SELECT job FROM processing_hold") as cur:
+                holds = [r[0] for r in await cur.fetchall()]
+            if any(job != self.job for job in holds):
+                raise RuntimeError(f"a --reset rebuild (job '{holds[0]}') is still unfinished; resume it first")
+            if holds and self.restart and not self.reset:
+                raise RuntimeError("an interrupted --reset rebuild of this job holds live processing; "
+                                   "resume it, or rerun with --reset")
+            if self.restart:
+                await db.execute("DELETE FROM replay_jobs WHERE job = ?", (self.job,))
+                await db.execute("DELETE FROM replay_checkpoint WHERE job = ?", (self.job,))
+            async with db.execute(
+                "SELECT workers, reset, until_received_at, until_seq, done_received_at, done_seq, finished_at "
+                "FROM replay_jobs WHERE job = ?", (self.job,)
+            ) as cur:
+                row = await cur.fetchone()
+            if row is None:
+                if self.reset:
+                    # the DELETEs take the write lock: no event is stored or processed
+                    # from here until commit, so `until` splits replayed from held events
+                    for table in processors.tables():
+                        await db.execute(f"DELETE FROM {table}")
+                    await db.execute("INSERT OR REPLACE INTO processing_hold (job) VALUES (?)", (self.job,))
+                self.until = await self.store.last_event_key()
+                await db.execute(
+                    "INSERT INTO replay_jobs (job, workers, reset, until_received_at, until_seq) VALUES (?, ?, ?, ?, ?)",
+                    (self.job, self.workers, int(self.reset), *(self.until or (None, None))),
+                )
+            else:
+                if row[0] != self.workers:
+                    raise RuntimeError("checkpoint was made with other options; rerun with --restart")
+                if row[6] is not None:
+                    self.state = "done"  # finished earlier; --restart to run again
+                self.reset = bool(row[1])
+                self.until = (row[2], row[3]) if row[2] is not None else None
+                self.done = (row[4], row[5]) if row[4] is not None else None
+                async with db.execute(
+                    "SELECT partition, received_at, seq, processed FROM replay_checkpoint WHERE job = ?", (self.job,)
+                ) as cur:
+                    for partition, received_at, seq, processed in await cur.fetchall():
+                        self._checkpoints[partition] = (received_at, seq)
+                        self.resumed += processed
+            await db.commit()
+        # a reset job must still release its hold, even with nothing to replay
+        return self.state != "done" and (self.until is not None or self.reset)
+
+    async def _save(self):
+        async with self.store.derived().write() as db:
+            await db.execute(
+                "UPDATE replay_jobs SET until_received_at = ?, until_seq = ?, done_received_at = ?, done_seq = ? "
+                "WHERE job = ?",
+                (*(self.until or (None, None)), *(self.done or (None, None)), self.job),
+            )
+            await db.commit()
+
+    def _start_key(self) -> Optional[EventKey]:
+        # partitions without a checkpoint have applied nothing after `done`
+        if len(self._checkpoints) < self.workers:
+            return self.done
+        oldest = min(self._checkpoints.values())
+        return oldest if _newer(oldest, self.done) else self.done
+
+    async def _apply(self, partition: int, events: List[StoredEvent]):
+        rows = _rows(events)
+        last = events[-1]
+
+        async def checkpoint(db):
+            await db.execute(
+                "INSERT INTO replay_checkpoint (job, partition, received_at, seq, processed) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(job, partition) DO UPDATE SET received_at = excluded.received_at, "
+                "seq = excluded.seq, processed = processed + excluded.processed",
+                (self.job, partition, last[0], last[1], len(events)),
+            )
+
+        # payloads are parsed above, outside the writer -> overlaps with other partitions' writes
+        await self.store.process(rows, on_commit=checkpoint)
+        self._checkpoints[partition] = (last[0], last[1])
+        self.processed += len(events)
+
+    async def _partition(self, partition: int, queue: "asyncio.Queue[Optional[StoredEvent]]"):
+        while True:
+            # whatever is queued (up to batch_size) goes into one transaction
+            events = [await queue.get()]
+            while len(events) < self.batch_size and not queue.empty():
+                events.append(queue.get_nowait())
+            done = events[-1] is None
+            if done:
+                events.pop()
+            if events:
+                await self._apply(partition, events)
+            if done:
+                return
+
+    async def _read(self, queues: List["asyncio.Queue[Optional[StoredEvent]]"]):
+        last_report = time.monotonic()
+        # aclosing -> the cursor's connection goes back to the pool even when cancelled
+        async with aclosing(self.store.iter_events(self._start_key(), self.until, self.batch_size)) as batches:
+            async for batch in batches:
+                for event in batch:
+                    partition = partition_of(event, self.workers)
+                    done = self._checkpoints.get(partition)
+                    if done is None or (event[0], event[1]) > done:
+                        await queues[partition].put(event)
+                self.scanned += len(batch)
+                self.position = (batch[-1][0], batch[-1][1])
+                if time.monotonic() - last_report >= REPORT_EVERY:
+                    last_report = time.monotonic()
+                    log.info("replay_progress", **self.as_dict())
+        for q in queues:
+            await q.put(None)
+
+    async def _pass(self):
+        """Apply everything in (done, until] through the partitions."""
+        if _newer(self.until, self.done):
+            # bounded queues: the reader waits for slow partitions (memory stays flat)
+            queues = [asyncio.Queue(maxsize=self.batch_size) for _ in range(self.workers)]
+            tasks = [asyncio.create_task(self._partition(p, q)) for p, q in enumerate(queues)]
+            tasks.append(asyncio.create_task(self._read(queues)))
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                task.result()  # re-raise the first failure
+            self.done = self.until
+            await self._save()
+
+    async def _catch_up(self):
+        """Reset job: apply the events held while it ran, until few are left."""
+        while True:
+            last = await self.store.last_event_key()
+            if not _newer(last, self.done):
+                return
+            before = self.processed
+            self.until = last
+            await self._save()
+            await self._pass()
+            if self.processed - before < self.batch_size:
+                return
+
+    async def _finish(self):
+        async with self.store.derived().write() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            if self.reset:
+                # holding the write lock: nothing new is stored until commit, so the
+                # last held events and the release of the hold land together
+                last = await self.store.last_event_key()
+                if _newer(last, self.done):
+                    async with aclosing(self.store.iter_events(self.done, last, self.batch_size)) as batches:
+                        async for batch in batches:
+                            for row in _rows(batch):
+                                await processors.process_event(db, row[1], row[2], row[5], derived=True)
+                            self.scanned += len(batch)
+                            self.processed += len(batch)
+                            self.position = (batch[-1][0], batch[-1][1])
+                    self.done = self.until = last
+                await db.execute("DELETE FROM processing_hold WHERE job = ?", (self.job,))
+            await db.execute(
+                "UPDATE replay_jobs SET finished_at = datetime('now'), done_received_at = ?, done_seq = ? "
+                "WHERE job = ?",
+                (*(self.done or (None, None)), self.job),
+            )
+            await db.commit()
+
+    async def run(self) -> Dict[str, Any]:
+        self.state = "running"
+        self.started = time.monotonic()
+        try:
+            if await self._prepare():
+                await self._pass()
+                if self.reset:
+                    await self._catch_up()
+                await self._finish()
+        except BaseException as e:
+            self.state = "failed"
+            self.error = repr(e)
+            self.elapsed = time.monotonic() - self.started
+            log.error("replay_failed", **self.as_dict())
+            raise
+        self.state = "done"
+        self.elapsed = time.monotonic() - self.started
+        log.info("replay_done", **self.as_dict())
+        return self.as_dict()
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = self.elapsed if self.state in ("done", "failed") else \
+            (time.monotonic() - self.started if self.started else 0.0)
+        return {
+            "job": self.job,
+            "state": self.state,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "reset": self.reset,
+            "scanned": self.scanned,
+            "processed": self.processed,
+            "resumed": self.resumed,
+            "position": list(self.position) if self.position else None,
+            "until": list(self.until) if self.until else None,
+            "holding_live": self.reset and self.state == "running",
+            "elapsed_s": round(elapsed, 3),
+            "events_per_s": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0,
+            "error": self.error,
+        }
+
+
+# last run started through start() (admin endpoint)
+_current: Optional[Replay] = None
+_task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+
+
+async def replay(**options) -> Dict[str, Any]:
+    """Run a replay to the end (CLI) -> final status."""
+    return await Replay(get_container().events(), **options).run()
+
+
+def start(**options) -> Replay:
+    """Start a replay in the background; RuntimeError if one is running."""
+    global _current, _task
+    if running():
+        raise RuntimeError("a replay is already running")
+    _current = Replay(get_container().events(), **options)
+    _task = asyncio.create_task(_current.run())
+    _task.add_done_callback(lambda t: t.cancelled() or t.exception())  # failure is in the status
+    return _current
+
+
+def running() -> bool:
+    return _task is not None and not _task.done()
+
+
+def status() -> Optional[Dict[str, Any]]:
+    return _current.as_dict() if _current else None
+
+
+async def stop():
+    if _task is not None and not _task.done():
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
@@ -0,0 +1,76 @@
+# src/routes/admin.py
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+from .. import replay
+from ..config import Settings, get_settings
+
+# router for operator endpoints (bearer ADMIN_TOKEN)
+router = APIRouter()
+
+
+def require_admin(
+    authorization: Optional[str] = Header(None),
+    settings: Settings = Depends(get_settings),
+):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "NotFound", "message": "Admin endpoints are disabled (set ADMIN_TOKEN)"}
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    # constant time comparison, like the webhook signature check
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail={"error": "Unauthorized", "message": "Missing or invalid admin token"}
+        )
+
+
+class ReplayOptions(BaseModel):
+    job: str = Field("default", min_length=1, max_length=64)
+    workers: int = Field(4, ge=1, le=64)
+    batch_size: int = Field(1000, ge=1, le=10000)
+    reset: bool = False      # empty the derived tables first (full rebuild)
+    restart: bool = False    # ignore the job's checkpoint
+
+
+@router.post("/admin/replay", status_code=202, dependencies=[Depends(require_admin)])
+async def start_replay(options: ReplayOptions):
+    """
+    Re-run the event processors over the stored webhook events (background)
+    -> 202 + status; poll GET /admin/replay for progress
+    -> 409 if a replay is already running
+    -> resumes the job's checkpoint unless restart/reset is set
+    -> reset holds live derived-state processing until the replay caught up
+       (SQLite only: with EVENT_STORE=postgres the hold can't be made atomic
+       with the shared inserts -> 409, use scripts/replay.py --reset with
+       webhook delivery paused)
+    """
+    if options.reset and get_settings().EVENT_STORE != "sqlite":
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "Conflict",
+                    "message": "reset needs EVENT_STORE=sqlite while live; pause webhooks and run scripts/replay.py --reset"}
+        )
+    try:
+        job = replay.start(**options.model_dump())
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail={"error": "Conflict", "message": str(e)})
+    return job.as_dict()
+
+
+@router.get("/admin/replay", dependencies=[Depends(require_admin)])
+async def replay_status():
+    """
+    Progress of the last replay started here (position, events/s, state)
+    -> 404 if none was started since this process came up
+    """
+    found = replay.status()
+    if found is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "NotFound", "message": "No replay was started in this process"}
+        )
+    return found
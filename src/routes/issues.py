@@ -1,20 +1,35 @@
 ### Prachi Gupta SJSU ID- 019106594 ###
 # src/routes/issues.py
-from fastapi import APIRouter, HTTPException, Response, Query, Path
+import json
+import structlog
+from fastapi import APIRouter, Header, HTTPException, Request, Query, Path
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from ..models import CreateIssue, UpdateIssue, Issue, Comment, CreateComment
 from .. import github_client as gh
-from ..pagination import forward_pagination_headers
+from .. import issue_index
+from ..http_cache import conditional_json, issue_etag, issues_etag
+from ..pagination import forward_pagination_headers, local_pagination_headers
+from ..serializers import COMMENT, COMMENT_LIST, ISSUE, ISSUE_LIST, json_response
+from .writes import queued_write
+
+IDEMPOTENCY_KEY = Header(None, alias="Idempotency-Key", min_length=1, max_length=255,
+                         description="Queue the write (202 + status URL); repeats return the original result")
+
+STREAM_CHUNK = 64 * 1024  # bytes per write for GET /issues?stream=true
 
 # router for issues related APIs
 router = APIRouter()
+log = structlog.get_logger()
 
 
 @router.post("/issues", status_code=201, response_model=Issue)
-async def create_issue(payload: CreateIssue, response: Response):
+async def create_issue(payload: CreateIssue, idempotency_key: Optional[str] = IDEMPOTENCY_KEY):
     """
     Create a new issue in GitHub repo
     -> On success returns 201 with Location header
+    -> GitHub errors are mapped centrally (see main.py)
+    -> with Idempotency-Key: queued, 202 + status URL
     """
     # title check (title should not be empty)
     if not payload.title or not payload.title.strip():
@@ -22,108 +37,153 @@ async def create_issue(payload: CreateIssue, response: Response):
             status_code=400,
             detail={"error": "BadRequest", "message": "title is required"}
         )
-    try:
-        # call github client to create issue
-        created = await gh.create_issue(payload.title, payload.body, payload.labels)
-        response.headers["Location"] = f"/issues/{created['number']}"
-        return created
-    except gh.GitHubError as e:
-        # handle errors properly
-        if e.status in (401, 403):
-            raise HTTPException(
-                status_code=401,
-                detail={"error": "Unauthorized", "message": e.message, "details": e.details}
-            )
-        elif e.status == 404:
-            raise HTTPException(
-                status_code=404,
-                detail={"error": "NotFound", "message": "Repo not found or no access", "details": e.details}
-            )
-        else:
-            raise HTTPException(
-                status_code=502,
-                detail={"error": "GitHubError", "message": e.message, "details": e.details}
-            )
+    if idempotency_key:
+        args = {"title": payload.title, "body": payload.body, "labels": payload.labels}
+        return await queued_write(idempotency_key, "create_issue", args, location="/issues/{number}")
+    # call github client to create issue
+    created = await gh.create_issue(payload.title, payload.body, payload.labels)
+    return json_response(ISSUE, created, 201, {"Location": f"/issues/{created['number']}"})
 
 
 @router.get("/issues", response_model=List[Issue])
 async def list_issues(
-    response: Response,
+    request: Request,
     state: str = Query("open", pattern="^(open|closed|all)$"),
     labels: Optional[str] = Query(None, description='Comma-separated labels like "bug,frontend"'),
     page: int = Query(1, ge=1),
     per_page: int = Query(30, ge=1, le=100),
+    label_query: Optional[str] = Query(None, description='Boolean label expression like "bug OR regression, NOT wontfix"'),
+    q: Optional[str] = Query(None, min_length=1, description="Case-insensitive substring of title or body"),
+    source: str = Query("github", pattern="^(github|local)$"),
+    sort: str = Query("created", pattern="^(created|updated|number)$"),
+    direction: str = Query("desc", pattern="^(asc|desc)$"),
+    stream: bool = Query(False, description="Stream the page item by item (uncached, constant memory)"),
 ):
     """
     List issues from GitHub repo
     -> Pagination is supported (like GitHub)
     -> Also forwards pagination headers
+    -> label_query / q / source=local -> answered from the local
+       webhook-fed index instead (sort + direction apply there)
+    -> ETag / If-None-Match (304) supported
+    -> stream=true -> same JSON array, but parsed from GitHub and written
+       to the client one issue at a time (skips the cache)
     """
-    try:
-        issues, headers = await gh.list_issues(state, labels, page, per_page)
-        # forward pagination headers
-        for k, v in forward_pagination_headers(headers).items():
-            response.headers[k] = v
-        return issues
-    except gh.GitHubError as e:
-        code = 401 if e.status in (401, 403) else (404 if e.status == 404 else 502)
-        err = "Unauthorized" if code == 401 else ("NotFound" if code == 404 else "GitHubError")
-        raise HTTPException(
-            status_code=code,
-            detail={"error": err, "message": e.message, "details": e.details}
-        )
+    if label_query or q or source == "local":
+        if labels:
+            # GitHub's AND semantics expressed as a label query
+            label_query = f"({label_query}) , {labels}" if label_query else labels
+        try:
+            issues, total = await issue_index.query_issues(
+                label_query, q, state, sort, direction, page, per_page
+            )
+        except issue_index.QueryError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={"error": "BadRequest", "message": f"Invalid label_query: {e}"}
+            )
+        return conditional_json(request, ISSUE_LIST, issues, issues_etag(issues, "issues:local"),
+                                local_pagination_headers(request.url, page, per_page, total))
+
+    if stream:
+        # upstream errors surface here, before the response starts
+        items, headers = await gh.stream_issues(state, labels, page, per_page)
+
+        async def body():
+            # small issues are grouped into ~STREAM_CHUNK writes (one ASGI send each)
+            out, size, sep = [], 0, b"["
+            try:
+                async for issue in items:
+                    out += (sep, ISSUE.dump_json(issue))
+                    size += len(out[-1])
+                    sep = b","
+                    if size >= STREAM_CHUNK:
+                        yield b"".join(out)
+                        out, size = [], 0
+            except Exception as e:
+                # status is already sent -> cut the body short so the client sees invalid JSON
+                log.warning("issue_stream_aborted", page=page, error=repr(e))
+                raise
+            out.append(b"]" if sep == b"," else b"[]")
+            yield b"".join(out)
+
+        return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+    issues, headers = await gh.list_issues(state, labels, page, per_page)
+    # forward pagination headers; 304 if the client's ETag still matches
+    return conditional_json(request, ISSUE_LIST, issues, issues_etag(issues), forward_pagination_headers(headers))
 
 
 @router.get("/issues/{number}", response_model=Issue)
-async def get_issue(number: int = Path(..., ge=1)):
+async def get_issue(request: Request, number: int = Path(..., ge=1)):
     """
     Get single issue by its number
+    -> ETag / If-None-Match (304) supported
     """
-    try:
-        return await gh.get_issue(number)
-    except gh.GitHubError as e:
-        if e.status == 404:
-            raise HTTPException(
-                status_code=404,
-                detail={"error": "NotFound", "message": f"Issue {number} not found", "details": e.details}
-            )
-        code = 401 if e.status in (401, 403) else 502
-        err = "Unauthorized" if code == 401 else "GitHubError"
-        raise HTTPException(
-            status_code=code,
-            detail={"error": err, "message": e.message, "details": e.details}
-        )
+    issue = await gh.get_issue(number)
+    return conditional_json(request, ISSUE, issue, issue_etag(issue))
 
 
 @router.patch("/issues/{number}", response_model=Issue)
 async def patch_issue(
     number: int = Path(..., ge=1),
     payload: UpdateIssue = ...,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
 ):
     """
     Update issue by number
     -> can update title, body or state (open/closed)
+    -> with Idempotency-Key: queued, 202 + status URL
     """
-    try:
-        return await gh.update_issue(number, payload.title, payload.body, payload.state)
-    except gh.GitHubError as e:
-        if e.status == 404:
-            raise HTTPException(
-                status_code=404,
-                detail={"error": "NotFound", "message": f"Issue {number} not found", "details": e.details}
-            )
-        code = 401 if e.status in (401, 403) else 502
-        err = "Unauthorized" if code == 401 else "GitHubError"
-        raise HTTPException(
-            status_code=code,
-            detail={"error": err, "message": e.message, "details": e.details}
-        )
+    if idempotency_key:
+        args = {"number": number, "title": payload.title, "body": payload.body, "state": payload.state}
+        return await queued_write(idempotency_key, "update_issue", args)
+    return json_response(ISSUE, await gh.update_issue(number, payload.title, payload.body, payload.state))
+
+
+@router.get("/issues/{number}/comments", response_model=List[Comment])
+async def list_comments(
+    request: Request,
+    number: int = Path(..., ge=1),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(30, ge=1, le=100),
+    stream: bool = Query(False, description="NDJSON stream of the whole thread (ignores page/per_page)"),
+):
+    """
+    List comments of an issue
+    -> paginated like GitHub, forwards Link/rate-limit headers
+    -> cached per issue (issue_comment webhooks invalidate it)
+    -> stream=true or Accept: application/x-ndjson -> one comment per line,
+       pages fetched from GitHub as the client reads
+    """
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        pages = gh.iter_comments(number)
+        # first page before the response starts -> GitHub errors still map to a proper status
+        first = await pages.__anext__()
+
+        async def lines():
+            for c in first:
+                yield COMMENT.dump_json(c) + b"\n"
+            try:
+                async for chunk in pages:
+                    for c in chunk:
+                        yield COMMENT.dump_json(c) + b"\n"
+            except gh.GitHubError as e:
+                # status is already sent -> end the stream with an error line
+                log.warning("comment_stream_aborted", issue_number=number, github_status=e.status)
+                yield json.dumps({"error": "GitHubError", "message": e.message, "details": e.details}).encode() + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    comments, headers = await gh.list_comments(number, page, per_page)
+    return json_response(COMMENT_LIST, comments, headers=forward_pagination_headers(headers))
 
 
 @router.post("/issues/{number}/comments", status_code=201, response_model=Comment)
-async def add_comment(number: int, payload: CreateComment):
+async def add_comment(number: int, payload: CreateComment, idempotency_key: Optional[str] = IDEMPOTENCY_KEY):
     """
     Add comment to issue by number
+    -> with Idempotency-Key: queued, 202 + status URL
     """
     # comment body should not be empty
     if not payload.body or not payload.body.strip():
@@ -131,17 +191,6 @@ async def add_comment(number: int, payload: CreateComment):
             status_code=400,
             detail={"error": "BadRequest", "message": "comment body is required"}
         )
-    try:
-        return await gh.create_comment(number, payload.body)
-    except gh.GitHubError as e:
-        if e.status == 404:
-            raise HTTPException(
-                status_code=404,
-                detail={"error": "NotFound", "message": f"Issue {number} not found", "details": e.details}
-            )
-        code = 401 if e.status in (401, 403) else 502
-        err = "Unauthorized" if code == 401 else "GitHubError"
-        raise HTTPException(
-            status_code=code,
-            detail={"error": err, "message": e.message, "details": e.details}
-        )
+    if idempotency_key:
+        return await queued_write(idempotency_key, "create_comment", {"number": number, "body": payload.body})
+    return json_response(COMMENT, await gh.create_comment(number, payload.body), 201)
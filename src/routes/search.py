@@ -0,0 +1,34 @@
+# src/routes/search.py
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from .. import search as fts
+
+# router for full-text search over the local index
+router = APIRouter()
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256, description="Words to match (all required, `word*` = prefix)"),
+    kind: str = Query("all", pattern="^(all|issue|comment)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    Full-text search over issue titles, bodies and comments
+    -> ranked (bm25, title hits weigh more), with highlighted snippets
+    -> keyset pagination: pass back next_cursor (also in Link rel="next")
+    -> served from SQLite FTS5 fed by webhooks/backfill (no GitHub calls)
+    """
+    try:
+        items, next_cursor = await fts.search(q, kind, limit, cursor)
+    except fts.SearchError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "BadRequest", "message": f"Invalid search: {e}"}
+        )
+    if next_cursor:
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return {"items": items, "next_cursor": next_cursor}
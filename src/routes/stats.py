@@ -0,0 +1,30 @@
+# src/routes/stats.py
+from fastapi import APIRouter, HTTPException, Path
+from .. import stats
+
+# router for aggregates derived from webhook events
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Aggregates kept up to date by the webhook event processors
+    -> open/closed totals, per-label open/closed counts, total comments
+    -> served from local tables (no GitHub calls)
+    """
+    return await stats.get_stats()
+
+
+@router.get("/stats/issues/{number}")
+async def get_issue_stats(number: int = Path(..., ge=1)):
+    """
+    Derived state for one issue (state, labels, comment count)
+    """
+    found = await stats.get_issue_stats(number)
+    if found is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "NotFound", "message": f"No events seen for issue {number}"}
+        )
+    return found
@@ -3,17 +3,18 @@ import json
 import hmac
 import hashlib
 import structlog
-from fastapi import APIRouter, Header, HTTPException, Request, Response, Query
-from ..config import get_settings
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, Query
+from ..config import Settings, get_settings
+from ..http_cache import conditional_json, make_etag
+from ..serializers import EVENT_LIST
 from ..storage import insert_event, list_recent_events
 
 # router for webhook & events
 router = APIRouter()
 log = structlog.get_logger()
-settings = get_settings()
 
 
-def verify_signature(raw_body: bytes, signature_header: str | None) -> bool:
+def verify_signature(raw_body: bytes, signature_header: str | None, secret: str | None = None) -> bool:
     """
     Verify GitHub webhook signature (HMAC SHA-256)
     Format of header: 'sha256=<hexdigest>'
@@ -21,9 +22,11 @@ def verify_signature(raw_body: bytes, signature_header: str | None) -> bool:
     if not signature_header or not signature_header.startswith("sha256="):
         return False
 
+    if secret is None:
+        secret = get_settings().WEBHOOK_SECRET
     sent_hex = signature_header.split("=", 1)[1]
     calc_hex = hmac.new(
-        settings.WEBHOOK_SECRET.encode(),
+        secret.encode(),
         msg=raw_body,
         digestmod=hashlib.sha256
     ).hexdigest()
@@ -38,6 +41,7 @@ async def webhook(
     x_github_event: str = Header(..., alias="X-GitHub-Event"),
     x_github_delivery: str = Header(..., alias="X-GitHub-Delivery"),
     x_hub_signature_256: str | None = Header(None, alias="X-Hub-Signature-256"),
+    settings: Settings = Depends(get_settings),
 ):
     """
     Endpoint to receive GitHub webhook events
@@ -47,7 +51,7 @@ async def webhook(
     raw = await request.body()
 
     # 2) verify signature with secret
-    if not verify_signature(raw, x_hub_signature_256):
+    if not verify_signature(raw, x_hub_signature_256, settings.WEBHOOK_SECRET):
         raise HTTPException(
             status_code=401,
             detail={"error": "InvalidSignature", "message": "HMAC verification failed"}
@@ -75,7 +79,8 @@ async def webhook(
         x_github_event,
         action,
         issue_number,
-        json.dumps(payload)
+        json.dumps(payload),
+        payload,
     )
 
     # 6) log acknowledgement
@@ -92,9 +97,15 @@ async def webhook(
 
 
 @router.get("/events")
-async def get_events(limit: int = Query(20, ge=1, le=100)):
+async def get_events(request: Request, limit: int = Query(20, ge=1, le=100)):
     """
     Fetch recent events stored in DB
     -> default 20, max 100
+    -> ETag / If-None-Match (304) supported (stored rows never change)
     """
-    rows = await list_recent_e
+    rows = await list_recent_events(limit)
+    events = [
+        {"id": r[0], "event": r[1], "action": r[2], "issue_number": r[3], "timestamp": r[4]}
+        for r in rows
+    ]
+    return conditional_json(request, EVENT_LIST, events, make_etag("events", [list(r) for r in rows]))
@@ -0,0 +1,54 @@
+# src/routes/writes.py
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Path
+from fastapi.responses import JSONResponse, Response
+from .. import github_client as gh
+from .. import write_queue
+
+# router for the async write pipeline (status of queued mutations)
+router = APIRouter()
+
+
+async def queued_write(key: str, op: str, args: Dict[str, Any], location: Optional[str] = None) -> Response:
+    """
+    Shared by the mutating issue routes when an Idempotency-Key is sent
+    -> new key: queue it, 202 + status URL
+    -> known key: the original outcome (no second GitHub call)
+    """
+    try:
+        write, _ = await write_queue.submit(key, op, args)
+    except write_queue.IdempotencyConflict:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "Conflict", "message": "Idempotency-Key was already used for a different request"}
+        )
+    if write["status"] == "succeeded":
+        headers = {"Idempotent-Replayed": "true"}
+        if location:
+            headers["Location"] = location.format(**write["result"])
+        return JSONResponse(write["result"], status_code=write["status_code"], headers=headers)
+    if write["status"] == "failed":
+        # same envelope/status the synchronous call would have produced
+        err = write["error"] or {}
+        raise gh.GitHubError(err.get("github_status") or 502, err.get("message", "write failed"), err.get("details"))
+    status_url = f"/writes/{write['id']}"
+    return JSONResponse(
+        {"id": write["id"], "status": write["status"], "status_url": status_url},
+        status_code=202,
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/writes/{write_id}")
+async def get_write(write_id: str = Path(..., min_length=1, max_length=64)):
+    """
+    Status of a queued write: pending | running | succeeded | failed
+    -> result holds the issue/comment once succeeded
+    """
+    write = await write_queue.get_write(write_id)
+    if write is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "NotFound", "message": f"Write {write_id} not found"}
+        )
+    return write
@@ -0,0 +1,224 @@
+# src/search.py
+# Full-text search over issue titles, bodies and comments (SQLite FTS5).
+#  - kept up to date by `issues` / `issue_comment` webhook handlers
+#  - can be (re)filled from GitHub with backfill()
+#  - queried by GET /search (bm25 ranking, snippets, keyset pagination)
+#
+# Row ids are chosen so updates are cheap primary-key writes:
+#   issue doc   -> rowid = -issue_number
+#   comment doc -> rowid = comment id (GitHub ids are positive)
+
+import base64
+import html
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiosqlite
+import structlog
+
+from . import processors, storage
+from .pagination import has_next_page
+
+log = structlog.get_logger()
+
+processors.schema("""
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+  title,
+  body,
+  number UNINDEXED,
+  kind UNINDEXED,
+  html_url UNINDEXED,
+  updated_at UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2'
+);
+""")
+
+# title matches weigh more than body matches
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+class SearchError(ValueError):
+    """Raised for an unusable query or cursor (mapped to 400 by the route)."""
+
+
+# ======================
+# Indexing
+# ======================
+
+async def index_issue_doc(db, issue: Dict[str, Any]):
+    number = issue["number"]
+    await db.execute("DELETE FROM search_fts WHERE rowid = ?", (-number,))
+    await db.execute(
+        "INSERT INTO search_fts (rowid, title, body, number, kind, html_url, updated_at) "
+        "VALUES (?, ?, ?, ?, 'issue', ?, ?)",
+        (-number, issue.get("title") or "", issue.get("body") or "", number,
+         issue.get("html_url"), issue.get("updated_at")),
+    )
+
+
+async def index_comment_doc(db, number: int, comment: Dict[str, Any]):
+    await db.execute("DELETE FROM search_fts WHERE rowid = ?", (comment["id"],))
+    await db.execute(
+        "INSERT INTO search_fts (rowid, title, body, number, kind, html_url, updated_at) "
+        "VALUES (?, '', ?, ?, 'comment', ?, ?)",
+        (comment["id"], comment.get("body") or "", number,
+         comment.get("html_url"), comment.get("updated_at") or comment.get("created_at")),
+    )
+
+
+@processors.on("issues")
+async def index_issue_event(db, payload: Dict[str, Any]):
+    issue = payload.get("issue") or {}
+    number = issue.get("number")
+    if number is None:
+        return
+    if payload.get("action") == "deleted" or issue.get("pull_request") is not None:
+        # full scan on an UNINDEXED column, but issue deletes are rare
+        await db.execute("DELETE FROM search_fts WHERE number = ?", (number,))
+        return
+    await index_issue_doc(db, issue)
+
+
+@processors.on("issue_comment")
+async def index_comment_event(db, payload: Dict[str, Any]):
+    comment = payload.get("comment") or {}
+    issue = payload.get("issue") or {}
+    number = issue.get("number")
+    # PR conversation comments arrive as issue_comment too; PRs aren't indexed
+    if "id" not in comment or number is None or issue.get("pull_request") is not None:
+        return
+    if payload.get("action") == "deleted":
+        await db.execute("DELETE FROM search_fts WHERE rowid = ?", (comment["id"],))
+        return
+    await index_comment_doc(db, number, comment)
+
+
+async def backfill(include_comments: bool = True, per_page: int = 100) -> Dict[str, int]:
+    """
+    Index every issue (and optionally its comments) straight from GitHub.
+    -> one transaction per page of issues
+    -> safe to re-run: docs are replaced by rowid
+    """
+    from . import github_client as gh
+
+    counts = {"issues": 0, "comments": 0}
+    page = 1
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        while True:
+            issues, headers = await gh.list_issues("all", None, page, per_page)
+            for issue in issues:
+                await index_issue_doc(db, issue)
+                counts["issues"] += 1
+                if include_comments:
+                    async for comments in gh.iter_comments(issue["number"], per_page):
+                        for c in comments:
+                            await index_comment_doc(db, issue["number"], c)
+                        counts["comments"] += len(comments)
+            await db.commit()
+            log.info("search_backfill_page", page=page, **counts)
+            # list_issues drops PRs, so page size says nothing -> follow Link rel="next"
+            if not has_next_page(headers):
+                break
+            page += 1
+    return counts
+
+
+# ======================
+# Query
+# ======================
+
+_WORD = re.compile(r"[\w][\w'-]*\*?", re.UNICODE)
+
+
+def to_fts_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word becomes a quoted
+    term (implicit AND), a trailing * keeps prefix matching.
+    """
+    terms = []
+    for word in _WORD.findall(text):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', "")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    if not terms:
+        raise SearchError("query has no searchable words")
+    return " ".join(terms)
+
+
+def encode_cursor(score: float, rowid: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, rowid]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, rowid = json.loads(raw)
+        return float(score), int(rowid)
+    except Exception as e:
+        raise SearchError("invalid cursor") from e
+
+
+def highlight(snippet: Optional[str]) -> str:
+    """
+    FTS snippet -> safe HTML: escape the indexed text (user content),
+    then turn the control-char match markers into <mark> tags
+    """
+    return html.escape(snippet or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+async def search(
+    text: str,
+    kind: str = "all",
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Ranked full-text search.
+    -> results ordered by (bm25 score, rowid); cursor = last (score, rowid)
+    -> returns (items, next_cursor or None)
+    """
+    where = ["search_fts MATCH ?"]
+    args: List[Any] = [to_fts_query(text)]
+    if kind != "all":
+        where.append("kind = ?")
+        args.append(kind)
+    if cursor:
+        score, rowid = decode_cursor(cursor)
+        where.append("(score > ? OR (score = ? AND rowid > ?))")
+        args.extend([score, score, rowid])
+    sql = f"""
+        SELECT rowid, number, kind, html_url, updated_at, title,
+               snippet(search_fts, -1, char(2), char(3), '…', 16),
+               bm25(search_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score
+        FROM search_fts
+        WHERE {' AND '.join(where)}
+        ORDER BY score, rowid
+        LIMIT ?
+    """
+    args.append(limit + 1)  # one extra row tells us whether there is a next page
+
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        try:
+            async with db.execute(sql, args) as cur:
+                rows = await cur.fetchall()
+        except aiosqlite.OperationalError as e:
+            raise SearchError(str(e)) from e
+
+    items = [
+        {
+            "number": r[1],
+            "kind": r[2],
+            "comment_id": r[0] if r[2] == "comment" else None,
+            "html_url": r[3],
+            "updated_at": r[4],
+            "title": r[5] or None,
+            "snippet": highlight(r[6]),
+            "score": -r[7],  # bm25 is "lower is better"; expose higher-is-better
+        }
+        for r in rows[:limit]
+    ]
+    next_cursor = encode_cursor(rows[limit - 1][7], rows[limit - 1][0]) if len(rows) > limit else None
+    return items, next_cursor
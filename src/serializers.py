@@ -0,0 +1,68 @@
+# src/serializers.py
+# Fast JSON response path for payloads that are already shaped by
+# github_client._normalize_issue / _normalize_comment (or the local index).
+# The adapters are built once at import and serialize dicts to JSON bytes in
+# one pass inside pydantic-core, with no per-item model instance and no
+# response_model re-validation. Routes keep response_model=... for OpenAPI,
+# but return these Responses directly, so FastAPI skips its own
+# validate + jsonable_encoder + json.dumps steps.
+
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict  # pydantic needs this one on Python < 3.12
+
+
+# same fields as models.Issue / models.Comment (dict shapes, not models)
+class LabelDict(TypedDict):
+    name: str
+
+
+class IssueDict(TypedDict):
+    number: int
+    html_url: str
+    state: str
+    title: str
+    body: Optional[str]
+    labels: List[LabelDict]
+    created_at: str
+    updated_at: str
+
+
+class CommentDict(TypedDict):
+    id: int
+    body: str
+    user: Dict[str, Any]
+    created_at: str
+    html_url: str
+
+
+# GET /events rows
+class EventDict(TypedDict):
+    id: str
+    event: str
+    action: Optional[str]
+    issue_number: Optional[int]
+    timestamp: Optional[str]
+
+
+ISSUE = TypeAdapter(IssueDict)
+ISSUE_LIST = TypeAdapter(List[IssueDict])
+COMMENT = TypeAdapter(CommentDict)
+COMMENT_LIST = TypeAdapter(List[CommentDict])
+EVENT_LIST = TypeAdapter(List[EventDict])
+
+
+def json_response(
+    adapter: TypeAdapter,
+    data: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    return Response(
+        content=adapter.dump_json(data),
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type="application/json",
+    )
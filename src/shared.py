@@ -0,0 +1,225 @@
+# src/shared.py
+# Pluggable key/value backend shared by all worker processes.
+# Used for the GitHub response cache, cross-process single-flight leases
+# and the rate-limit budget (see cache.py / ratelimit.py).
+#
+#   memory -> per-process dict (default, single worker only)
+#   sqlite -> one SQLite file in WAL mode, shared by every worker on the host
+#   redis  -> any Redis-compatible server (needs `pip install redis`)
+#
+# Values are strings; counters are stored as their decimal text.
+
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+import aiosqlite
+
+
+class SharedBackend:
+    """Interface every backend implements (all methods are atomic)."""
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    # set only if the key is missing/expired -> True if we set it (used for leases)
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    async def incr(self, key: str, delta: int = 1) -> int:
+        raise NotImplementedError
+
+    # decrement only while the value stays above `floor` -> new value, or None if not taken
+    async def decr_if_above(self, key: str, floor: int) -> Optional[int]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MemoryBackend(SharedBackend):
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+
+    def _live(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key):
+        return self._live(key)
+
+    async def set(self, key, value, ttl=None):
+        self._data[key] = (value, None if ttl is None else time.monotonic() + ttl)
+
+    async def delete(self, key):
+        self._data.pop(key, None)
+
+    async def add(self, key, value, ttl):
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def incr(self, key, delta=1):
+        value = int(self._live(key) or 0) + delta
+        self._data[key] = (str(value), None)
+        return value
+
+    async def decr_if_above(self, key, floor):
+        current = self._live(key)
+        if current is None or int(current) <= floor:
+            return None
+        value = int(current) - 1
+        self._data[key] = (str(value), self._data[key][1])
+        return value
+
+
+class SQLiteBackend(SharedBackend):
+    """
+    Cross-process store on a local SQLite file.
+    -> WAL mode: readers never block the single writer
+    -> autocommit: every statement below is its own atomic transaction
+    """
+
+    CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS kv (
+      key TEXT PRIMARY KEY,
+      value,
+      expires_at REAL
+    );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def _conn(self) -> aiosqlite.Connection:
+        if self._db is None:
+            db = await aiosqlite.connect(self.path, timeout=10, isolation_level=None)
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute("PRAGMA synchronous=NORMAL")
+            await db.execute(self.CREATE_SQL)
+            self._db = db
+        return self._db
+
+    async def _one(self, sql: str, args: tuple):
+        db = await self._conn()
+        async with db.execute(sql, args) as cur:
+            return await cur.fetchone()
+
+    async def get(self, key):
+        row = await self._one(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        )
+        return None if row is None else str(row[0])
+
+    async def set(self, key, value, ttl=None):
+        db = await self._conn()
+        await db.execute(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, None if ttl is None else time.time() + ttl),
+        )
+        # cheap housekeeping: now and then drop expired rows
+        if random.random() < 0.01:
+            await db.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+
+    async def delete(self, key):
+        db = await self._conn()
+        await db.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    async def add(self, key, value, ttl):
+        now = time.time()
+        row = await self._one(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ? "
+            "RETURNING key",
+            (key, value, now + ttl, now),
+        )
+        return row is not None
+
+    async def incr(self, key, delta=1):
+        row = await self._one(
+            "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, NULL) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value "
+            "RETURNING value",
+            (key, delta),
+        )
+        return int(row[0])
+
+    async def decr_if_above(self, key, floor):
+        row = await self._one(
+            "UPDATE kv SET value = CAST(value AS INTEGER) - 1 "
+            "WHERE key = ? AND CAST(value AS INTEGER) > ? "
+            "AND (expires_at IS NULL OR expires_at > ?) RETURNING value",
+            (key, floor, time.time()),
+        )
+        return None if row is None else int(row[0])
+
+    async def aclose(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+# Lua keeps "check then decrement" atomic on the server
+_DECR_IF_ABOVE_LUA = """
+local v = tonumber(redis.call('GET', KEYS[1]))
+if v == nil or v <= tonumber(ARGV[1]) then return nil end
+return redis.call('DECR', KEYS[1])
+"""
+
+
+class RedisBackend(SharedBackend):
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis  # optional dependency
+        except ImportError as e:
+            raise RuntimeError("SHARED_BACKEND=redis needs the 'redis' package (pip install redis)") from e
+        self._r = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key):
+        return await self._r.get(key)
+
+    async def set(self, key, value, ttl=None):
+        await self._r.set(key, value, px=None if ttl is None else int(ttl * 1000))
+
+    async def delete(self, key):
+        await self._r.delete(key)
+
+    async def add(self, key, value, ttl):
+        return bool(await self._r.set(key, value, px=int(ttl * 1000), nx=True))
+
+    async def incr(self, key, delta=1):
+        return int(await self._r.incrby(key, delta))
+
+    async def decr_if_above(self, key, floor):
+        value = await self._r.eval(_DECR_IF_ABOVE_LUA, 1, key, floor)
+        return None if value is None else int(value)
+
+    async def aclose(self):
+        await self._r.aclose()
+
+
+def make_backend(kind: str, sqlite_path: str = "shared.db", redis_url: str = "") -> SharedBackend:
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if kind == "redis":
+        return RedisBackend(redis_url)
+    raise RuntimeError(f"Unknown SHARED_BACKEND '{kind}' (expected memory, sqlite or redis)")
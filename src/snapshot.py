@@ -0,0 +1,216 @@
+# src/snapshot.py
+# Bulk-load the local store so a fresh deploy starts warm.
+#  - backfill(): pull every issue (and optionally its comments) from GitHub with
+#    concurrent pagination and run them through the event processors, so every
+#    derived table (stats, label index, search) is filled. Pages are written in
+#    windows, one transaction per window, with a resumable checkpoint.
+#  - export_snapshot() / import_snapshot(): dump the derived tables to a gzip
+#    JSON-lines file and load it into another replica without calling GitHub.
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import aiosqlite
+import structlog
+
+from . import processors, storage
+from .deps import get_container
+from .pagination import last_page
+
+log = structlog.get_logger()
+
+SNAPSHOT_FORMAT = "issues-gw-snapshot"
+SNAPSHOT_VERSION = 1
+
+# derived tables carried in a snapshot (FTS tables need their rowid)
+SNAPSHOT_TABLES = {
+    "issue_state": False,
+    "label_counts": False,
+    "comment_counts": False,
+    "totals": False,
+    "issue_index": False,
+    "issue_labels": False,
+    "search_fts": True,
+}
+
+CHECKPOINT_SQL = """
+CREATE TABLE IF NOT EXISTS snapshot_checkpoint (
+  job TEXT PRIMARY KEY,
+  next_page INTEGER NOT NULL,
+  last_page INTEGER,
+  per_page INTEGER NOT NULL,
+  with_comments INTEGER NOT NULL,
+  updated_at TEXT DEFAULT (datetime('now'))
+);
+"""
+
+
+async def _fetch_page(page: int, per_page: int, with_comments: bool, limit: asyncio.Semaphore):
+    from . import github_client as gh
+
+    async with limit:
+        issues, headers = await gh.list_issues("all", None, page, per_page)
+    comments: Dict[int, List[Dict[str, Any]]] = {}
+    if with_comments:
+        async def one(number: int):
+            found: List[Dict[str, Any]] = []
+            async with limit:
+                async for chunk in gh.iter_comments(number):
+                    found.extend(chunk)
+            comments[number] = found
+        await asyncio.gather(*(one(i["number"]) for i in issues))
+    return issues, comments, headers
+
+
+async def _apply_page(db, issues, comments) -> Dict[str, int]:
+    counts = {"issues": 0, "comments": 0}
+    for issue in issues:
+        payload_issue = dict(issue)
+        if issue["number"] in comments:
+            payload_issue["comments"] = len(comments[issue["number"]])
+        # derived only: a backfill writes derived state, per-issue cache invalidation is a live side effect
+        await processors.process_event(
+            db, "issues", "backfill", {"action": "backfill", "issue": payload_issue}, derived=True
+        )
+        counts["issues"] += 1
+        for c in comments.get(issue["number"], []):
+            await processors.process_event(
+                db, "issue_comment", "backfill",
+                {"action": "backfill", "issue": {"number": issue["number"]}, "comment": c},
+                derived=True,
+            )
+            counts["comments"] += 1
+    return counts
+
+
+async def backfill(
+    with_comments: bool = False,
+    concurrency: int = 4,
+    per_page: int = 100,
+    restart: bool = False,
+    job: str = "issues",
+) -> Dict[str, int]:
+    """
+    Fetch all issues (state=all) and feed them to the event processors.
+    -> `concurrency` pages are fetched at once, then written in one transaction
+       together with the checkpoint, so an interrupted run resumes at the first
+       page of the unfinished window
+    """
+    limit = asyncio.Semaphore(concurrency)
+    totals = {"issues": 0, "comments": 0, "pages": 0}
+    async with aiosqlite.connect(storage.DB_PATH, timeout=30) as db:
+        await db.executescript(CHECKPOINT_SQL)
+        if restart:
+            await db.execute("DELETE FROM snapshot_checkpoint WHERE job = ?", (job,))
+        async with db.execute(
+            "SELECT next_page, last_page, per_page, with_comments FROM snapshot_checkpoint WHERE job = ?", (job,)
+        ) as cur:
+            row = await cur.fetchone()
+        await db.commit()
+        if row and (row[2] != per_page or bool(row[3]) != with_comments):
+            raise RuntimeError("checkpoint was made with other options; rerun with --restart")
+
+        next_page: int = row[0] if row else 1
+        final: Optional[int] = row[1] if row else None
+        prefetched = {}
+        if final is None:
+            # first page tells us how many pages there are (Link rel="last")
+            prefetched[next_page] = await _fetch_page(next_page, per_page, with_comments, limit)
+            final = last_page(prefetched[next_page][2]) or next_page
+
+        async def get(page: int):
+            return prefetched.pop(page, None) or await _fetch_page(page, per_page, with_comments, limit)
+
+        while next_page <= final:
+            pages = range(next_page, min(next_page + concurrency, final + 1))
+            window = await asyncio.gather(*(get(p) for p in pages))
+            # one transaction per window (taken after the fetch, so GitHub latency doesn't hold the lock)
+            await db.execute("BEGIN IMMEDIATE")
+            for issues, comments, _ in window:
+                counts = await _apply_page(db, issues, comments)
+                totals["issues"] += counts["issues"]
+                totals["comments"] += counts["comments"]
+            totals["pages"] += len(pages)
+            next_page = pages[-1] + 1
+            await db.execute(
+                "INSERT INTO snapshot_checkpoint (job, next_page, last_page, per_page, with_comments) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(job) DO UPDATE SET next_page = excluded.next_page, "
+                "last_page = excluded.last_page, updated_at = datetime('now')",
+                (job, next_page, final, per_page, int(with_comments)),
+            )
+            await db.commit()  # pages + checkpoint land together
+            log.info("backfill_window", window=f"{pages[0]}-{pages[-1]}", last_page=final, **totals)
+    return totals
+
+
+async def export_snapshot(path: str) -> Dict[str, int]:
+    """Write the derived tables to a gzip JSON-lines snapshot file."""
+    s = get_container().settings
+    counts: Dict[str, int] = {}
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        with gzip.open(path, "wt", encoding="utf-8") as out:
+            out.write(json.dumps({
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "repo": f"{s.GITHUB_OWNER}/{s.GITHUB_REPO}",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }) + "\n")
+            for table, with_rowid in SNAPSHOT_TABLES.items():
+                async with db.execute(f"SELECT {'rowid, ' if with_rowid else ''}* FROM {table}") as cur:
+                    columns = [d[0] for d in cur.description]
+                    out.write(json.dumps({"table": table, "columns": columns}) + "\n")
+                    counts[table] = 0
+                    while True:
+                        rows = await cur.fetchmany(1000)
+                        if not rows:
+                            break
+                        out.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in rows)
+                        counts[table] += len(rows)
+    return counts
+
+
+async def import_snapshot(path: str) -> Dict[str, int]:
+    """
+    Replace the derived tables with the snapshot's rows (one transaction).
+    -> refuses snapshots of another repo
+    """
+    s = get_container().settings
+    counts: Dict[str, int] = {}
+    await storage.init_db()
+    with gzip.open(path, "rt", encoding="utf-8") as src:
+        header = json.loads(src.readline())
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise RuntimeError(f"{path} is not a v{SNAPSHOT_VERSION} snapshot")
+        if header.get("repo") != f"{s.GITHUB_OWNER}/{s.GITHUB_REPO}":
+            raise RuntimeError(f"snapshot is for {header.get('repo')}, not {s.GITHUB_OWNER}/{s.GITHUB_REPO}")
+
+        async with aiosqlite.connect(storage.DB_PATH, timeout=30) as db:
+            for table in SNAPSHOT_TABLES:
+                await db.execute(f"DELETE FROM {table}")
+            table, insert, batch = None, None, []
+            for line in src:
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    if batch:
+                        await db.executemany(insert, batch)
+                        batch = []
+                    table = item["table"]
+                    if table not in SNAPSHOT_TABLES:
+                        raise RuntimeError(f"unexpected table {table} in snapshot")
+                    cols = ", ".join(item["columns"])
+                    marks = ", ".join("?" for _ in item["columns"])
+                    insert = f"INSERT INTO {table} ({cols}) VALUES ({marks})"
+                    counts[table] = 0
+                    continue
+                batch.append(item)
+                counts[table] += 1
+                if len(batch) >= 1000:
+                    await db.executemany(insert, batch)
+                    batch = []
+            if batch:
+                await db.executemany(insert, batch)
+            await db.commit()
+    return counts
@@ -0,0 +1,46 @@
+# src/startup.py
+# Tiny cold-start profiler: records how long each import/init phase takes.
+# Stdlib only, so it can be imported first and time everything after it.
+#   with report.phase("import:routes"):
+#       from .routes import ...
+# The report is logged on startup and served at GET /debug/startup.
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.ready_ms: float | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def mark_ready(self):
+        self.ready_ms = (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {name: round(ms, 3) for name, ms in self.phases},
+            "total_phases_ms": round(sum(ms for _, ms in self.phases), 3),
+            "ready_ms": None if self.ready_ms is None else round(self.ready_ms, 3),
+        }
+
+
+report = StartupReport()
+
+
+# python -m src.startup -> import the app in this fresh process and print the report
+if __name__ == "__main__":
+    import json
+    import src.main  # noqa: F401
+    from src.startup import report as app_report  # the instance src.main filled in
+    print(json.dumps(app_report.as_dict(), indent=2))
@@ -0,0 +1,168 @@
+# src/stats.py
+# Built-in event handlers that keep derived aggregates up to date:
+#  - open/closed totals and open/closed counts per label
+#  - comment counts per issue
+# GET /stats reads these tables directly instead of paging GitHub.
+
+import json
+from typing import Any, Dict, List, Optional
+
+import aiosqlite
+
+from . import processors, storage
+
+processors.schema("""
+CREATE TABLE IF NOT EXISTS issue_state (
+  number INTEGER PRIMARY KEY,
+  state TEXT NOT NULL,
+  labels TEXT NOT NULL DEFAULT '[]',
+  updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_issue_state_state ON issue_state (state);
+CREATE TABLE IF NOT EXISTS label_counts (
+  label TEXT PRIMARY KEY,
+  open_count INTEGER NOT NULL DEFAULT 0,
+  closed_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS comment_counts (
+  issue_number INTEGER PRIMARY KEY,
+  count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS totals (
+  name TEXT PRIMARY KEY,
+  value INTEGER NOT NULL DEFAULT 0
+);
+""")
+
+
+def _label_names(issue: Dict[str, Any]) -> List[str]:
+    return sorted({l["name"] for l in issue.get("labels") or [] if isinstance(l, dict) and "name" in l})
+
+
+async def _bump_total(db, name: str, delta: int):
+    await db.execute(
+        "INSERT INTO totals (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, delta),
+    )
+
+
+async def _bump_labels(db, labels: List[str], state: str, delta: int):
+    opened, closed = (delta, 0) if state == "open" else (0, delta)
+    await db.executemany(
+        "INSERT INTO label_counts (label, open_count, closed_count) VALUES (?, ?, ?) "
+        "ON CONFLICT(label) DO UPDATE SET "
+        "open_count = open_count + excluded.open_count, "
+        "closed_count = closed_count + excluded.closed_count",
+        [(name, opened, closed) for name in labels],
+    )
+
+
+async def _set_comment_count(db, number: int, count: int):
+    async with db.execute("SELECT count FROM comment_counts WHERE issue_number = ?", (number,)) as cur:
+        row = await cur.fetchone()
+    old = row[0] if row else 0
+    await db.execute(
+        "INSERT INTO comment_counts (issue_number, count) VALUES (?, ?) "
+        "ON CONFLICT(issue_number) DO UPDATE SET count = excluded.count",
+        (number, count),
+    )
+    await _bump_total(db, "comments", count - old)
+
+
+# issues.* -> move this issue's contribution from its old state/labels to the new ones
+@processors.on("issues")
+async def track_issue_state(db, payload: Dict[str, Any]):
+    issue = payload.get("issue") or {}
+    number = issue.get("number")
+    if number is None:
+        return
+
+    async with db.execute("SELECT state, labels FROM issue_state WHERE number = ?", (number,)) as cur:
+        old = await cur.fetchone()
+    if old:
+        await _bump_total(db, old[0], -1)
+        await _bump_labels(db, json.loads(old[1]), old[0], -1)
+
+    if payload.get("action") == "deleted":
+        await db.execute("DELETE FROM issue_state WHERE number = ?", (number,))
+        await _set_comment_count(db, number, 0)
+        await db.execute("DELETE FROM comment_counts WHERE issue_number = ?", (number,))
+        return
+
+    state = issue.get("state") or "open"
+    labels = _label_names(issue)
+    await _bump_total(db, state, 1)
+    await _bump_labels(db, labels, state, 1)
+    await db.execute(
+        "INSERT INTO issue_state (number, state, labels, updated_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(number) DO UPDATE SET "
+        "state = excluded.state, labels = excluded.labels, updated_at = excluded.updated_at",
+        (number, state, json.dumps(labels), issue.get("updated_at")),
+    )
+    # issue payloads carry the current comment count -> keep ours in sync
+    if isinstance(issue.get("comments"), int):
+        await _set_comment_count(db, number, issue["comments"])
+
+
+# issue_comment.created / deleted -> +1 / -1 on the issue's comment count
+@processors.on("issue_comment", "created")
+async def count_comment_created(db, payload: Dict[str, Any]):
+    number = (payload.get("issue") or {}).get("number")
+    if number is None:
+        return
+    await db.execute(
+        "INSERT INTO comment_counts (issue_number, count) VALUES (?, 1) "
+        "ON CONFLICT(issue_number) DO UPDATE SET count = count + 1",
+        (number,),
+    )
+    await _bump_total(db, "comments", 1)
+
+
+@processors.on("issue_comment", "deleted")
+async def count_comment_deleted(db, payload: Dict[str, Any]):
+    number = (payload.get("issue") or {}).get("number")
+    if number is None:
+        return
+    async with db.execute("SELECT count FROM comment_counts WHERE issue_number = ?", (number,)) as cur:
+        row = await cur.fetchone()
+    if row and row[0] > 0:
+        await _set_comment_count(db, number, row[0] - 1)
+
+
+# ---- read side (used by routes/stats.py) ----
+
+async def get_stats() -> Dict[str, Any]:
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        async with db.execute("SELECT name, value FROM totals") as cur:
+            totals = dict(await cur.fetchall())
+        async with db.execute(
+            "SELECT label, open_count, closed_count FROM label_counts "
+            "WHERE open_count > 0 OR closed_count > 0 ORDER BY label"
+        ) as cur:
+            labels = await cur.fetchall()
+    return {
+        "issues": {"open": totals.get("open", 0), "closed": totals.get("closed", 0)},
+        "comments": totals.get("comments", 0),
+        "labels": [{"name": l, "open": o, "closed": c} for l, o, c in labels],
+    }
+
+
+async def get_issue_stats(number: int) -> Optional[Dict[str, Any]]:
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        async with db.execute(
+            """
+            SELECT s.state, s.labels, COALESCE(c.count, 0)
+            FROM issue_state s LEFT JOIN comment_counts c ON c.issue_number = s.number
+            WHERE s.number = ?
+            """,
+            (number,),
+        ) as cur:
+            row = await cur.fetchone()
+        if row is None:
+            async with db.execute("SELECT count FROM comment_counts WHERE issue_number = ?", (number,)) as cur:
+                only_comments = await cur.fetchone()
+            if only_comments is None:
+                return None
+            return {"number": number, "state": None, "labels": [], "comments": only_comments[0]}
+    return {"number": number, "state": row[0], "labels": json.loads(row[1]), "comments": row[2]}
@@ -1,30 +1,27 @@
 ### Prachi Gupta SJSUID- 019106594 ###
 # src/storage.py
-import aiosqlite
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-# SQLite database file name
+from .deps import get_container
+from .event_store import EventRow, EventStore
+
+# SQLite database file name (events + derived tables; read on every call)
 DB_PATH = "events.db"
 
-# SQL schema -> create events table if not already present
-CREATE_SQL = """
-CREATE TABLE IF NOT EXISTS events (
-  delivery_id TEXT NOT NULL,
-  event TEXT NOT NULL,
-  action TEXT NOT NULL,
-  issue_number INTEGER,
-  payload TEXT,
-  received_at TEXT DEFAULT (datetime('now')),
-  PRIMARY KEY (delivery_id, action)
-);
-"""
+
+# backend chosen by EVENT_STORE (see event_store.py), built on first use
+def _store() -> EventStore:
+    return get_container().events()
 
 
-# init database -> create table on startup
+# init database -> create events table + tables used by event processors
 async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(CREATE_SQL)
-        await db.commit()
+    await _store().init()
+
+
+# close pooled connections (scripts must call this, or the process won't exit)
+async def close_db():
+    await get_container().aclose()
 
 
 # insert webhook event in DB (idempotent -> ignore duplicates)
@@ -34,38 +31,33 @@ async def insert_event(
     action: Optional[str],
     issue_number: Optional[int],
     payload: str,
+    data: Optional[Dict[str, Any]] = None,
 ):
-    action_key = action or ""  # make sure NOT NULL is satisfied
+    """
+    Store the event and, if it is new (not a redelivery), run the
+    event processors on it.
+    -> data is the already parsed payload (saves a json.loads)
+    """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                """
-                INSERT OR IGNORE INTO events
-                (delivery_id, event, action, issue_number, payload)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (str(delivery_id), str(event), str(action_key), issue_number, payload),
-            )
-            await db.commit()
+        await _store().insert_event((delivery_id, event, action, issue_number, payload, data))
     except Exception as e:
         # don’t crash webhook handler if DB write fails
         print("EVENT_STORE_WRITE_ERROR:", repr(e))
 
 
+# insert many events in one go (imports, benchmarks) -> number of new ones
+async def insert_events(rows: Sequence[EventRow]) -> int:
+    """
+    rows: (delivery_id, event, action, issue_number, payload, parsed payload or None)
+    -> duplicates (stored or within the batch) are skipped, processors run once per new event
+    """
+    return await _store().insert_events(rows)
+
+
 # get recent events (for debugging/inspection)
 async def list_recent_events(limit: int = 20) -> List[Tuple[str, str, str, Optional[int], str]]:
     """
     Return recent events like:
     [(id, event, action, issue_number, timestamp), ...]
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute(
-            """
-            SELECT delivery_id, event, action, issue_number, received_at
-            FROM events
-            ORDER BY received_at DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ) as cur:
-            return await cur.fetchall()
+    return await _store().list_recent_events(limit)
@@ -0,0 +1,245 @@
+# src/write_queue.py
+# Optional async write pipeline for issue mutations.
+#  - a request with an Idempotency-Key header is stored in the `writes` table
+#    (events.db) and answered 202 + status URL right away
+#  - worker tasks apply pending writes to GitHub with bounded concurrency,
+#    retrying 5xx / rate-limit / network failures with exponential backoff
+#  - the same key again returns the stored outcome (no second upstream call)
+# Claiming uses a single UPDATE ... RETURNING, so several worker processes
+# can share the table safely.
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiosqlite
+import httpx
+import structlog
+
+from . import github_client as gh
+from . import storage
+from .deps import get_container
+
+log = structlog.get_logger()
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS writes (
+  id TEXT PRIMARY KEY,
+  idempotency_key TEXT NOT NULL UNIQUE,
+  request_hash TEXT NOT NULL,
+  op TEXT NOT NULL,
+  args TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at REAL NOT NULL DEFAULT 0,
+  lease_until REAL,
+  status_code INTEGER,
+  result TEXT,
+  error TEXT,
+  created_at TEXT DEFAULT (datetime('now')),
+  updated_at TEXT DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_writes_due ON writes (status, next_attempt_at);
+"""
+
+BACKOFF_BASE = 1.0    # seconds, doubled per attempt
+BACKOFF_MAX = 300.0
+LEASE_SECONDS = 60.0  # a claimed write is retried by others if not finished by then
+
+# op name -> (github_client call, HTTP status of the synchronous route)
+OPS = {
+    "create_issue": (lambda a: gh.create_issue(a["title"], a.get("body"), a.get("labels")), 201),
+    "update_issue": (lambda a: gh.update_issue(a["number"], a.get("title"), a.get("body"), a.get("state")), 200),
+    "create_comment": (lambda a: gh.create_comment(a["number"], a["body"]), 201),
+}
+
+_wakeup: Optional[asyncio.Event] = None
+_workers: List[asyncio.Task] = []
+
+
+class IdempotencyConflict(Exception):
+    """Same Idempotency-Key reused with a different request."""
+
+
+async def init_queue():
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        await db.executescript(CREATE_SQL)
+        await db.commit()
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    (id_, key, op, status, attempts, code, result, error, created, updated) = row
+    return {
+        "id": id_,
+        "idempotency_key": key,
+        "op": op,
+        "status": status,
+        "attempts": attempts,
+        "status_code": code,
+        "result": json.loads(result) if result else None,
+        "error": json.loads(error) if error else None,
+        "created_at": created,
+        "updated_at": updated,
+    }
+
+
+_SELECT = (
+    "SELECT id, idempotency_key, op, status, attempts, status_code, result, error, created_at, updated_at "
+    "FROM writes"
+)
+
+
+async def submit(key: str, op: str, args: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Queue a write under an idempotency key.
+    -> returns (write record, True if newly queued / False if key already known)
+    -> raises IdempotencyConflict if the key was used for a different request
+    """
+    request_hash = hashlib.sha256(json.dumps([op, args], sort_keys=True).encode()).hexdigest()
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        cur = await db.execute(
+            "INSERT OR IGNORE INTO writes (id, idempotency_key, request_hash, op, args) VALUES (?, ?, ?, ?, ?)",
+            (uuid.uuid4().hex, key, request_hash, op, json.dumps(args)),
+        )
+        created = cur.rowcount == 1
+        await db.commit()
+        async with db.execute(f"{_SELECT} WHERE idempotency_key = ?", (key,)) as c:
+            row = await c.fetchone()
+        async with db.execute("SELECT request_hash FROM writes WHERE id = ?", (row[0],)) as c:
+            stored_hash = (await c.fetchone())[0]
+    if stored_hash != request_hash:
+        raise IdempotencyConflict(key)
+    if created and _wakeup is not None:
+        _wakeup.set()
+    return _row_to_dict(row), created
+
+
+async def get_write(write_id: str) -> Optional[Dict[str, Any]]:
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        async with db.execute(f"{_SELECT} WHERE id = ?", (write_id,)) as cur:
+            row = await cur.fetchone()
+    return _row_to_dict(row) if row else None
+
+
+async def _claim(db) -> Optional[Tuple[str, str, Dict[str, Any], int]]:
+    now = time.time()
+    async with db.execute(
+        """
+        UPDATE writes
+        SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = datetime('now')
+        WHERE id = (
+          SELECT id FROM writes
+          WHERE (status = 'pending' AND next_attempt_at <= ?)
+             OR (status = 'running' AND lease_until < ?)
+          ORDER BY next_attempt_at, created_at
+          LIMIT 1
+        )
+        RETURNING id, op, args, attempts
+        """,
+        (now + LEASE_SECONDS, now, now),
+    ) as cur:
+        row = await cur.fetchone()
+    await db.commit()
+    return (row[0], row[1], json.loads(row[2]), row[3]) if row else None
+
+
+def _retry_delay(attempts: int, err: Exception) -> Optional[float]:
+    """Seconds until the next try, or None if the error is permanent."""
+    if isinstance(err, gh.GitHubError):
+        retryable = (
+            err.status >= 500
+            or err.status == 429
+            or (err.status == 403 and "rate limit" in err.message.lower())
+        )
+        if not retryable:
+            return None
+        if "retry_after" in err.details:
+            return float(err.details["retry_after"])
+    elif not isinstance(err, httpx.TransportError):
+        return None
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX) * random.uniform(0.8, 1.2)
+
+
+async def process_one(db) -> bool:
+    """Claim and apply one due write. Returns False if nothing was due."""
+    claimed = await _claim(db)
+    if claimed is None:
+        return False
+    write_id, op, args, attempts = claimed
+    call, status_code = OPS[op]
+    try:
+        result = await call(args)
+    except Exception as e:
+        max_attempts = get_container().settings.WRITE_MAX_ATTEMPTS
+        delay = _retry_delay(attempts, e)
+        details = e.details if isinstance(e, gh.GitHubError) else {}
+        error = {"message": getattr(e, "message", repr(e)), "details": details,
+                 "github_status": getattr(e, "status", None)}
+        if delay is not None and attempts < max_attempts:
+            await db.execute(
+                "UPDATE writes SET status = 'pending', next_attempt_at = ?, error = ?, "
+                "updated_at = datetime('now') WHERE id = ?",
+                (time.time() + delay, json.dumps(error), write_id),
+            )
+            log.warning("write_retry", write_id=write_id, op=op, attempts=attempts, delay=round(delay, 2))
+        else:
+            await db.execute(
+                "UPDATE writes SET status = 'failed', error = ?, updated_at = datetime('now') WHERE id = ?",
+                (json.dumps(error), write_id),
+            )
+            log.error("write_failed", write_id=write_id, op=op, attempts=attempts, error=error["message"])
+        await db.commit()
+        return True
+    await db.execute(
+        "UPDATE writes SET status = 'succeeded', status_code = ?, result = ?, error = NULL, "
+        "updated_at = datetime('now') WHERE id = ?",
+        (status_code, json.dumps(result), write_id),
+    )
+    await db.commit()
+    log.info("write_applied", write_id=write_id, op=op, attempts=attempts)
+    return True
+
+
+async def run_pending() -> int:
+    """Apply every write that is due right now (used by tests and scripts)."""
+    done = 0
+    async with aiosqlite.connect(storage.DB_PATH) as db:
+        while await process_one(db):
+            done += 1
+    return done
+
+
+async def _worker(n: int, poll_interval: float):
+    async with aiosqlite.connect(storage.DB_PATH, timeout=10) as db:
+        while True:
+            try:
+                if await process_one(db):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error("write_worker_error", worker=n, error=repr(e))
+            # idle: wait for a new submit (this process) or poll (other processes / retries)
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def start_workers(count: int, poll_interval: float = 1.0):
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for n in range(count):
+        _workers.append(asyncio.create_task(_worker(n, poll_interval)))
+
+
+async def stop_workers():
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
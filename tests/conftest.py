@@ -54,3 +54,25 @@ async def client(app):
     # base_url is required by httpx; "http://testserver" is a conventional placeholder.
     async with httpx.AsyncClient(app=app, base_url="http://testserver") as ac:
         yield ac
+
+@pytest.fixture(autouse=True)
+async def fresh_github_client():
+    """
+    The gateway shares one GitHub client per process. Each test runs on its own
+    event loop, so I drop that client after every test and let the next one build its own.
+    """
+    yield
+    from src.deps import get_container
+    await get_container().aclose()
+
+@pytest.fixture
+async def event_db(tmp_path, monkeypatch):
+    """
+    I point the event store at a throwaway SQLite file and create the schema,
+    so tests that go through the webhook/derived tables never touch ./events.db.
+    """
+    from src import storage
+    path = str(tmp_path / "events.db")
+    monkeypatch.setattr(storage, "DB_PATH", path)
+    await storage.init_db()
+    return path
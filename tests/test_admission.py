@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+
+from src import admission
+from src.admission import RouteLimiter
+
+
+def test_limit_grows_when_fast_and_backs_off_when_slow():
+    limiter = RouteLimiter("GET /x", initial=10, min_limit=2, max_limit=12, queue_size=5, queue_timeout=1)
+    limiter.inflight = 10  # limit is in use
+    for _ in range(50):
+        limiter.observe(0.1, congested=False)
+    assert limiter.limit == 12  # additive increase, capped
+
+    limiter.observe(1.0, congested=False)  # 10x the baseline
+    assert limiter.limit == pytest.approx(12 * admission.BACKOFF)
+    limiter.observe(1.0, congested=False)  # same burst -> no second cut yet
+    assert limiter.limit == pytest.approx(12 * admission.BACKOFF)
+
+    limiter._last_decrease = 0
+    for _ in range(100):
+        limiter.observe(0.1, congested=True)
+        limiter._last_decrease = 0
+    assert limiter.limit == 2  # never below the floor
+
+
+@pytest.mark.asyncio
+async def test_saturated_route_queues_then_sheds(client, monkeypatch):
+    from src import github_client as gh
+
+    release = asyncio.Event()
+
+    async def slow_get_issue(number):
+        await release.wait()
+        return {"number": number, "html_url": "h", "state": "open", "title": "t", "body": None,
+                "labels": [], "created_at": "c", "updated_at": "u"}
+
+    monkeypatch.setattr(gh, "get_issue", slow_get_issue)
+    monkeypatch.setitem(admission.limiters, "GET /issues/{number}",
+                        RouteLimiter("GET /issues/{number}", 1, 1, 1, queue_size=1, queue_timeout=0.2))
+
+    first = asyncio.create_task(client.get("/issues/1"))   # takes the only slot
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(client.get("/issues/2"))  # waits in the queue
+    await asyncio.sleep(0.05)
+
+    shed = await client.get("/issues/3")                   # queue full
+    assert shed.status_code == 429
+    assert shed.json()["detail"]["error"] == "TooManyRequests"
+    assert int(shed.headers["Retry-After"]) >= 1
+
+    timed_out = await queued                               # deadline passed
+    assert timed_out.status_code == 503
+    assert timed_out.json()["detail"]["error"] == "Overloaded"
+    assert "Retry-After" in timed_out.headers
+
+    assert (await client.get("/healthz")).status_code == 200  # never limited
+    release.set()
+    assert (await first).status_code == 200
+    assert admission.limiters["GET /issues/{number}"].inflight == 0
@@ -0,0 +1,65 @@
+import hmac, hashlib, json, os
+import httpx
+import pytest
+import respx
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+BASE  = "https://api.github.com"
+URL   = f"{BASE}/repos/{OWNER}/{REPO}/issues/3/comments"
+
+
+def comment(i):
+    return {"id": i, "body": f"c{i}", "user": {"login": "u"}, "created_at": "a",
+            "html_url": f"h{i}", "node_id": "dropped"}
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_list_comments_paginates_caches_and_webhook_invalidates(client, webhook_secret, event_db):
+    link = '<https://api.github.com/x?page=2>; rel="next"'
+    route = respx.get(URL).mock(return_value=httpx.Response(
+        200, json=[comment(1), comment(2)], headers={"Link": link, "X-RateLimit-Limit": "5000"}
+    ))
+
+    resp = await client.get("/issues/3/comments?per_page=2")
+    assert resp.status_code == 200
+    assert [c["id"] for c in resp.json()] == [1, 2]
+    assert "node_id" not in resp.json()[0]
+    assert resp.headers["Link"] == link
+    await client.get("/issues/3/comments?per_page=2")
+    assert route.call_count == 1  # served from the per-issue cache
+
+    body = json.dumps({"action": "created", "issue": {"number": 3}, "comment": comment(9)}).encode()
+    sig = "sha256=" + hmac.new(webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+    await client.post("/webhook", content=body, headers={
+        "X-GitHub-Event": "issue_comment", "X-GitHub-Delivery": "c-1",
+        "X-Hub-Signature-256": sig, "Content-Type": "application/json",
+    })
+    await client.get("/issues/3/comments?per_page=2")
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_comments_as_ndjson_across_pages(client):
+    respx.get(URL, params={"page": "1"}).mock(return_value=httpx.Response(
+        200, json=[comment(1), comment(2)], headers={"Link": '<https://api.github.com/x?page=2>; rel="next"'}
+    ))
+    respx.get(URL, params={"page": "2"}).mock(return_value=httpx.Response(200, json=[comment(3)]))
+
+    resp = await client.get("/issues/3/comments", params={"stream": "true"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(l) for l in resp.text.splitlines()]
+    assert [c["id"] for c in lines] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_comments_missing_issue_is_404(client):
+    respx.get(f"{BASE}/repos/{OWNER}/{REPO}/issues/8/comments").mock(
+        return_value=httpx.Response(404, json={"message": "Not Found"})
+    )
+    resp = await client.get("/issues/8/comments", headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 404
@@ -55,4 +55,44 @@ async def test_get_issue_not_found_maps_to_404(client):
 
     # Ensure my gateway forwarded the error correctly.
     assert route.called
-    assert resp.status_code == 404
\ No newline at end of file
+    assert resp.status_code == 404
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_upstream_5xx_maps_to_502_and_404_names_issue(client):
+    """
+    Scenario: GitHub fails with 500 on PATCH, and 404 on a comment POST.
+    Expectation: the central GitHubError handler returns 502 GitHubError,
+    and 404 NotFound naming the issue from the path.
+    """
+    respx.patch(f"{BASE}/repos/{OWNER}/{REPO}/issues/5").mock(
+        return_value=httpx.Response(500, json={"message": "Server Error"})
+    )
+    respx.post(f"{BASE}/repos/{OWNER}/{REPO}/issues/6/comments").mock(
+        return_value=httpx.Response(404, json={"message": "Not Found"})
+    )
+
+    resp = await client.patch("/issues/5", json={"title": "x"})
+    assert resp.status_code == 502
+    assert resp.json()["detail"]["error"] == "GitHubError"
+
+    resp = await client.post("/issues/6/comments", json={"body": "hi"})
+    assert resp.status_code == 404
+    assert resp.json()["detail"]["message"] == "Issue 6 not found"
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_comment_response_keeps_only_contract_fields(client):
+    """
+    The fast serializer path must still trim GitHub's comment payload to our Comment shape.
+    """
+    respx.post(f"{BASE}/repos/{OWNER}/{REPO}/issues/7/comments").mock(
+        return_value=httpx.Response(201, json={
+            "id": 1, "body": "hi", "user": {"login": "me"}, "created_at": "a",
+            "html_url": "u", "node_id": "extra", "reactions": {"+1": 0},
+        })
+    )
+    resp = await client.post("/issues/7/comments", json={"body": "hi"})
+    assert resp.status_code == 201
+    assert set(resp.json()) == {"id", "body", "user", "created_at", "html_url"}
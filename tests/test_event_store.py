@@ -0,0 +1,62 @@
+import json, os, zlib
+import pytest
+
+from src import stats, storage
+from src.event_store import PostgresEventStore, SQLiteEventStore
+
+
+def comment_event(delivery, number=5):
+    payload = {"action": "created", "issue": {"number": number}, "comment": {"id": zlib.crc32(delivery.encode())}}  # stable across runs
+    return (delivery, "issue_comment", "created", number, json.dumps(payload), None)
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_skips_duplicates_and_processes_once(event_db):
+    await storage.insert_event(*comment_event("d1")[:5])
+    batch = [comment_event("d1"), comment_event("d2"), comment_event("d3"), comment_event("d2")]
+
+    assert await storage.insert_events(batch) == 2  # d1 already stored, d2 twice in the batch
+    assert (await stats.get_issue_stats(5))["comments"] == 3
+    rows = await storage.list_recent_events(10)
+    assert sorted(r[0] for r in rows) == ["d1", "d2", "d3"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_reuses_connections(tmp_path):
+    store = SQLiteEventStore(lambda: str(tmp_path / "e.db"), pool_size=2)
+    await store.init()
+    try:
+        for i in range(20):
+            assert await store.insert_event((f"x{i}", "ping", None, None, "{}", {})) is True
+            await store.list_recent_events(5)
+        assert await store.insert_event(("x0", "ping", None, None, "{}", {})) is False
+        conns = store._for_path()
+        assert len(conns.opened) == 2  # one writer + one reader, opened once
+    finally:
+        await store.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("EVENT_STORE_TEST_URL"),
+                    reason="Set EVENT_STORE_TEST_URL=postgresql://... to run (needs asyncpg)")
+async def test_postgres_store_roundtrip(tmp_path):
+    local = SQLiteEventStore(lambda: str(tmp_path / "local.db"))
+    store = PostgresEventStore(os.environ["EVENT_STORE_TEST_URL"], local, pool_size=2)
+    await store.init()
+    pool = await store.pool()
+    try:
+        await pool.execute("DELETE FROM events WHERE delivery_id LIKE 'pgtest-%'")
+        assert await store.insert_event(comment_event("pgtest-1")) is True
+        assert await store.insert_event(comment_event("pgtest-1")) is False
+        batch = [comment_event("pgtest-1"), comment_event("pgtest-2"), comment_event("pgtest-2")]
+        assert await store.insert_events(batch) == 1
+        rows = [r for r in await store.list_recent_events(100) if r[0].startswith("pgtest-")]
+        assert sorted(r[0] for r in rows) == ["pgtest-1", "pgtest-2"]
+        assert len(rows[0]) == 5 and isinstance(rows[0][4], str)
+        # processors ran on the local SQLite file, once per new event
+        async with local.read() as db:
+            async with db.execute("SELECT count FROM comment_counts WHERE issue_number = 5") as cur:
+                assert (await cur.fetchone())[0] == 2
+    finally:
+        await pool.execute("DELETE FROM events WHERE delivery_id LIKE 'pgtest-%'")
+        await store.aclose()
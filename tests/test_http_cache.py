@@ -0,0 +1,93 @@
+import hashlib, os
+import httpx
+import pytest
+import respx
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+URL   = f"https://api.github.com/repos/{OWNER}/{REPO}/issues"
+
+
+def issue(n, updated="2024-01-01T00:00:00Z", title=None):
+    return {"number": n, "html_url": f"h{n}", "state": "open", "title": title or f"t{n}", "body": "x" * 200,
+            "labels": [{"name": "bug"}], "created_at": "c", "updated_at": updated}
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_list_etag_304_and_change(client, monkeypatch):
+    from src.deps import get_container
+    monkeypatch.setattr(get_container().settings, "ISSUE_CACHE_TTL", 0)  # every call reaches GitHub
+    route = respx.get(URL).mock(return_value=httpx.Response(200, json=[issue(1), issue(2)]))
+
+    first = await client.get("/issues", headers={"Accept-Encoding": "identity"})
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    again = await client.get("/issues", headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+    route.mock(return_value=httpx.Response(200, json=[issue(1), issue(2, updated="2024-02-01T00:00:00Z")]))
+    changed = await client.get("/issues", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_edit_within_same_updated_at_is_not_served_stale(client, monkeypatch):
+    from src.deps import get_container
+    monkeypatch.setattr(get_container().settings, "ISSUE_CACHE_TTL", 0)
+    route = respx.get(f"{URL}/1").mock(return_value=httpx.Response(200, json=issue(1, title="old title")))
+    first = await client.get("/issues/1")
+    assert first.json()["title"] == "old title"
+
+    # title edited, GitHub's updated_at (1 s resolution) unchanged
+    route.mock(return_value=httpx.Response(200, json=issue(1, title="NEW title")))
+    changed = await client.get("/issues/1", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "NEW title"
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_large_response_is_gzipped_with_own_etag(client):
+    respx.get(URL).mock(return_value=httpx.Response(200, json=[issue(n) for n in range(1, 31)]))
+
+    resp = await client.get("/issues", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["ETag"].endswith('-gzip"')
+    assert len(resp.json()) == 30  # httpx decodes it
+    # either form of the tag validates the same content
+    again = await client.get("/issues", headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_small_response_not_gzipped(client):
+    resp = await client.get("/healthz", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_static_spec_content_etag(client):
+    path = os.path.join(os.path.dirname(__file__), "..", "public", "openapi.yaml")
+    with open(path, "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+    resp = await client.get("/public/openapi.yaml", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == f'"{digest}"'
+    again = await client.get("/public/openapi.yaml", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_events_etag(client, event_db):
+    first = await client.get("/events")
+    assert first.status_code == 200
+    again = await client.get("/events", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,73 @@
+import hmac, hashlib, json
+import pytest
+
+from src.issue_index import QueryError, parse_label_query
+
+
+def sign(secret: str, payload: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+
+
+async def send_issue(client, secret, delivery, action, number, title, labels, state="open", created="2024-01-01"):
+    payload = {"action": action, "issue": {
+        "number": number, "html_url": f"https://github.com/o/r/issues/{number}", "state": state,
+        "title": title, "body": f"body of {title}", "labels": [{"name": l} for l in labels],
+        "created_at": created, "updated_at": created,
+    }}
+    body = json.dumps(payload).encode()
+    resp = await client.post("/webhook", content=body, headers={
+        "X-GitHub-Event": "issues",
+        "X-GitHub-Delivery": delivery,
+        "X-Hub-Signature-256": sign(secret, body),
+        "Content-Type": "application/json",
+    })
+    assert resp.status_code == 204
+
+
+def test_parse_label_query_precedence():
+    # "," is the loosest AND -> the documented example
+    assert parse_label_query("bug OR regression, NOT wontfix") == (
+        "and", [("or", [("label", "bug"), ("label", "regression")]), ("not", ("label", "wontfix"))]
+    )
+    # AND still binds tighter than OR
+    assert parse_label_query("bug OR regression AND ui") == (
+        "or", [("label", "bug"), ("and", [("label", "regression"), ("label", "ui")])]
+    )
+    assert parse_label_query("ui, (bug, docs | regression)") == (
+        "and", [("label", "ui"), ("and", [("label", "bug"), ("or", [("label", "docs"), ("label", "regression")])])]
+    )
+    assert parse_label_query("(bug | regression) & -wontfix") == (
+        "and", [("or", [("label", "bug"), ("label", "regression")]), ("not", ("label", "wontfix"))]
+    )
+    assert parse_label_query('good first issue OR "Help Wanted"') == (
+        "or", [("label", "good first issue"), ("label", "help wanted")]
+    )
+    for bad in ("bug OR", "(bug", "bug )", ""):
+        with pytest.raises(QueryError):
+            parse_label_query(bad)
+
+
+@pytest.mark.asyncio
+async def test_label_query_served_from_local_index(client, webhook_secret, event_db):
+    await send_issue(client, webhook_secret, "d1", "opened", 1, "Crash on save", ["bug"], created="2024-01-01")
+    await send_issue(client, webhook_secret, "d2", "opened", 2, "Slow list", ["regression", "wontfix"], created="2024-01-02")
+    await send_issue(client, webhook_secret, "d3", "opened", 3, "Login crash", ["regression"], created="2024-01-03")
+    await send_issue(client, webhook_secret, "d4", "opened", 4, "Docs", ["docs"], created="2024-01-04")
+    await send_issue(client, webhook_secret, "d6", "opened", 5, "Won't do", ["bug", "wontfix"], created="2024-01-05")
+    # labels change -> index follows the latest event
+    await send_issue(client, webhook_secret, "d5", "labeled", 4, "Docs", ["docs", "bug"], created="2024-01-04")
+
+    resp = await client.get("/issues", params={"label_query": "bug OR regression, NOT wontfix"})
+    assert resp.status_code == 200
+    assert [i["number"] for i in resp.json()] == [4, 3, 1]
+    assert resp.headers["X-Total-Count"] == "3"
+
+    resp = await client.get("/issues", params={"label_query": "bug OR regression", "q": "CRASH",
+                                               "sort": "created", "direction": "asc"})
+    assert [i["number"] for i in resp.json()] == [1, 3]
+
+    resp = await client.get("/issues", params={"source": "local", "per_page": 2, "page": 1})
+    assert len(resp.json()) == 2
+    assert 'rel="next"' in resp.headers["Link"]
+
+    assert (await client.get("/issues", params={"label_query": "bug AND"})).status_code == 400
@@ -0,0 +1,67 @@
+import json, os
+import httpx
+import pytest
+import respx
+
+from src.jsonstream import JSONStreamError, iter_json_array
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+URL   = f"https://api.github.com/repos/{OWNER}/{REPO}/issues"
+
+
+def issue(n, **extra):
+    return {"number": n, "html_url": f"h{n}", "state": "open", "title": f"t{n}", "body": 'a "quoted" \\ body ]}',
+            "labels": [{"name": "bug", "id": 1}], "created_at": "c", "updated_at": "u", "user": {"login": "x"}, **extra}
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+async def test_iter_json_array_any_chunking(size):
+    items = [issue(1), {"nested": [[1, 2], {"s": "\\\"]"}]}, "str,ing", 12, None, [], {}, True]
+    raw = (" \n" + json.dumps(items, indent=1)).encode()
+    assert [x async for x in iter_json_array(chunked(raw, size))] == items
+    assert [x async for x in iter_json_array(chunked(b"[ ]", size))] == []
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_rejects_bad_input():
+    with pytest.raises(JSONStreamError):
+        [x async for x in iter_json_array(chunked(b'{"a": 1}', 4))]
+    with pytest.raises(JSONStreamError):
+        [x async for x in iter_json_array(chunked(b'[{"a": 1}, {"b"', 4))]
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_list_matches_buffered_list(client, monkeypatch):
+    from src.routes import issues as issues_routes
+    monkeypatch.setattr(issues_routes, "STREAM_CHUNK", 1)  # one write per issue
+    page = [issue(1), issue(2, pull_request={"url": "x"}), issue(3)]
+    link = '<https://api.github.com/x?page=2>; rel="next"'
+    respx.get(URL).mock(return_value=httpx.Response(
+        200, json=page, headers={"Link": link, "X-RateLimit-Remaining": "10", "X-GitHub-Request-Id": "drop"}
+    ))
+
+    streamed = await client.get("/issues", params={"stream": "true", "state": "all"})
+    buffered = await client.get("/issues", params={"state": "all"})
+    assert streamed.status_code == 200
+    assert streamed.json() == buffered.json()
+    assert [i["number"] for i in streamed.json()] == [1, 3]
+    assert streamed.headers["Link"] == link
+    assert streamed.headers["X-RateLimit-Remaining"] == "10"
+    assert "X-GitHub-Request-Id" not in streamed.headers
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_stream_list_upstream_error_keeps_status(client):
+    respx.get(URL).mock(return_value=httpx.Response(401, json={"message": "Bad credentials"}))
+    resp = await client.get("/issues", params={"stream": "true"})
+    assert resp.status_code == 401
+    assert resp.json()["detail"]["error"] == "Unauthorized"
@@ -0,0 +1,168 @@
+import asyncio, json
+import pytest
+
+from src import cache, replay, stats, storage
+from src.config import get_settings
+from src.deps import get_container
+
+
+def issue(number, state="open", labels=()):
+    return {"number": number, "state": state, "labels": [{"name": l} for l in labels],
+            "comments": 0, "updated_at": "a"}
+
+
+def make_events(issues=6):
+    rows = []
+    for n in range(1, issues + 1):
+        for i, (event, action, payload) in enumerate([
+            ("issues", "opened", {"issue": issue(n, labels=["bug"])}),
+            ("issue_comment", "created", {"issue": {"number": n}, "comment": {"id": n * 10}}),
+            ("issues", "closed", {"issue": issue(n, "closed", ["bug"])}),
+            ("issue_comment", "created", {"issue": {"number": n}, "comment": {"id": n * 10 + 1}}),
+        ]):
+            payload["action"] = action
+            rows.append((f"d{n}-{i}", event, action, n, json.dumps(payload), None))
+    rows.append(("p1", "ping", None, None, "{}", None))
+    return rows
+
+
+async def insert(rows):
+    # one at a time: same received_at second, so the rowid decides the order
+    for row in rows:
+        await storage.insert_event(*row[:5])
+
+
+@pytest.mark.asyncio
+async def test_reset_replay_rebuilds_derived_state(event_db):
+    await insert(make_events())
+    before = await stats.get_stats()
+    # "closed" carries comments=0 and resets the count -> only the last comment counts
+    assert before["issues"] == {"open": 0, "closed": 6} and before["comments"] == 6
+
+    result = await replay.replay(workers=3, batch_size=5, reset=True)
+    assert result["state"] == "done" and result["processed"] == 25
+    # per-issue order kept, comments counted exactly once
+    assert await stats.get_stats() == before
+    # finished job -> running it again without --restart is a no-op
+    assert (await replay.replay(workers=3, batch_size=5))["processed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_replay_resumes_from_partition_checkpoints(event_db, monkeypatch):
+    await insert(make_events())
+    before = await stats.get_stats()
+    store = get_container().events()
+    real_process = type(store).process
+    calls = 0
+
+    async def flaky(self, rows, on_commit=None):
+        nonlocal calls
+        calls += 1
+        if calls == 4:
+            raise RuntimeError("disk full")
+        await real_process(self, rows, on_commit)
+
+    monkeypatch.setattr(type(store), "process", flaky)
+    with pytest.raises(RuntimeError):
+        await replay.replay(workers=2, batch_size=2, reset=True)
+    monkeypatch.setattr(type(store), "process", real_process)
+
+    result = await replay.replay(workers=2, batch_size=2)
+    assert result["resumed"] > 0 and result["resumed"] + result["processed"] == 25
+    assert await stats.get_stats() == before  # nothing skipped, nothing applied twice
+
+    with pytest.raises(RuntimeError, match="other options"):
+        await replay.replay(workers=3, batch_size=2)
+
+
+@pytest.mark.asyncio
+async def test_failed_checkpoint_rolls_back_the_applied_group(event_db, monkeypatch):
+    for i in range(6):
+        payload = {"action": "created", "issue": {"number": 5}, "comment": {"id": i}}
+        await storage.insert_event(f"c{i}", "issue_comment", "created", 5, json.dumps(payload))
+    before = await stats.get_stats()
+    assert (await stats.get_issue_stats(5))["comments"] == 6
+    store = get_container().events()
+    real_process = type(store).process
+    calls = 0
+
+    async def failing_checkpoint(self, rows, on_commit=None):
+        nonlocal calls
+        calls += 1
+
+        async def checkpoint(db):
+            await on_commit(db)
+            if calls == 2:
+                raise RuntimeError("disk full")  # after the handlers wrote the group
+
+        await real_process(self, rows, checkpoint)
+
+    monkeypatch.setattr(type(store), "process", failing_checkpoint)
+    with pytest.raises(RuntimeError):
+        await replay.replay(workers=1, batch_size=3, reset=True)
+    monkeypatch.setattr(type(store), "process", real_process)
+
+    result = await replay.replay(workers=1, batch_size=3)
+    assert result["resumed"] == 3 and result["processed"] == 3
+    assert (await stats.get_issue_stats(5))["comments"] == 6
+    assert await stats.get_stats() == before
+
+
+@pytest.mark.asyncio
+async def test_live_events_during_reset_are_applied_after_replayed_ones(event_db, monkeypatch):
+    await insert(make_events(2)[:1])  # issue 1 opened
+    invalidated = []
+
+    async def count_invalidation(number=None):
+        invalidated.append(number)
+
+    monkeypatch.setattr(cache, "invalidate_issue", count_invalidation)
+    store = get_container().events()
+    real_process = type(store).process
+    seen_while_held = []
+
+    async def process_with_live_webhook(self, rows, on_commit=None):
+        if not seen_while_held:
+            # webhook arrives mid-replay: "closed" for an issue the replay hasn't applied yet
+            closed = {"action": "closed", "issue": issue(1, "closed", ["bug"])}
+            await storage.insert_event("live-1", "issues", "closed", 1, json.dumps(closed))
+            seen_while_held.append(await stats.get_issue_stats(1))
+        await real_process(self, rows, on_commit)
+
+    monkeypatch.setattr(type(store), "process", process_with_live_webhook)
+    result = await replay.replay(workers=2, batch_size=10, reset=True)
+
+    assert seen_while_held == [None]  # held: derived tables untouched by the live event
+    assert invalidated == [1]  # ...but its cache invalidation ran; replayed events invalidate nothing
+    assert result["processed"] == 2
+    assert (await stats.get_issue_stats(1))["state"] == "closed"  # replayed "opened" came first
+    assert (await stats.get_stats())["issues"] == {"open": 0, "closed": 1}
+
+    # hold released -> live processing is back
+    reopened = {"action": "reopened", "issue": issue(1)}
+    await storage.insert_event("live-2", "issues", "reopened", 1, json.dumps(reopened))
+    assert (await stats.get_issue_stats(1))["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_admin_replay_endpoint(client, event_db, monkeypatch):
+    await insert(make_events(2))
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "")
+    assert (await client.get("/admin/replay")).status_code == 404  # disabled
+
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "sekret")
+    assert (await client.post("/admin/replay", json={})).status_code == 401
+    auth = {"Authorization": "Bearer sekret"}
+    resp = await client.post("/admin/replay", json={"reset": True, "workers": 2}, headers=auth)
+    assert resp.status_code == 202 and resp.json()["workers"] == 2
+
+    for _ in range(100):
+        status = (await client.get("/admin/replay", headers=auth)).json()
+        if status["state"] in ("done", "failed"):
+            break
+        await asyncio.sleep(0.01)
+    assert status["state"] == "done" and status["processed"] == 9
+    assert status["events_per_s"] > 0
+    assert (await client.post("/admin/replay", json={"workers": 0}, headers=auth)).status_code == 400
+    monkeypatch.setattr(get_settings(), "EVENT_STORE", "postgres")
+    assert (await client.post("/admin/replay", json={"reset": True}, headers=auth)).status_code == 409
@@ -0,0 +1,110 @@
+import os
+import hmac, hashlib, json
+import httpx
+import pytest
+import respx
+
+from src import search as fts
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+BASE  = "https://api.github.com"
+
+
+def sign(secret: str, payload: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+
+
+async def send(client, secret, event, delivery, payload):
+    body = json.dumps(payload).encode()
+    resp = await client.post("/webhook", content=body, headers={
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": delivery,
+        "X-Hub-Signature-256": sign(secret, body),
+        "Content-Type": "application/json",
+    })
+    assert resp.status_code == 204
+
+
+def gh_issue(number, title, body):
+    return {"number": number, "html_url": f"https://github.com/o/r/issues/{number}", "state": "open",
+            "title": title, "body": body, "labels": [], "created_at": "a", "updated_at": "a"}
+
+
+@pytest.mark.asyncio
+async def test_search_from_webhooks_with_ranking_and_cursor(client, webhook_secret, event_db):
+    await send(client, webhook_secret, "issues", "d1", {"action": "opened", "issue": gh_issue(1, "Crash on save", "boom")})
+    await send(client, webhook_secret, "issues", "d2", {"action": "opened", "issue": gh_issue(2, "Slow list", "it may crash later")})
+    await send(client, webhook_secret, "issue_comment", "d3", {
+        "action": "created", "issue": gh_issue(2, "Slow list", ""),
+        "comment": {"id": 900, "body": "same crash here", "html_url": "c", "created_at": "a"},
+    })
+
+    resp = await client.get("/search", params={"q": "crash"})
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert items[0]["number"] == 1  # title hit ranks first
+    assert {i["kind"] for i in items} == {"issue", "comment"}
+    assert "<mark>" in items[0]["snippet"]
+
+    # walk the same results one at a time via the cursor
+    seen, cursor = [], None
+    while True:
+        params = {"q": "crash", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/search", params=params)).json()
+        seen += [(i["number"], i["comment_id"]) for i in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [(i["number"], i["comment_id"]) for i in items]
+
+    # edits replace the doc, deletes remove it
+    await send(client, webhook_secret, "issue_comment", "d4", {
+        "action": "deleted", "issue": gh_issue(2, "Slow list", ""), "comment": {"id": 900},
+    })
+    resp = await client.get("/search", params={"q": "crash", "kind": "comment"})
+    assert resp.json()["items"] == []
+
+    # comments on pull requests (same event type) are not indexed
+    await send(client, webhook_secret, "issue_comment", "d5", {
+        "action": "created", "issue": {**gh_issue(3, "A PR", ""), "pull_request": {"url": "u"}},
+        "comment": {"id": 901, "body": "crash in the PR", "html_url": "c", "created_at": "a"},
+    })
+    resp = await client.get("/search", params={"q": "crash", "kind": "comment"})
+    assert resp.json()["items"] == []
+
+    assert (await client.get("/search", params={"q": "!!!"})).status_code == 400
+    assert (await client.get("/search", params={"q": "crash", "cursor": "nope"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_snippet_escapes_indexed_html(client, webhook_secret, event_db):
+    body = 'crash <script>alert("x")</script> & <b>more</b>'
+    await send(client, webhook_secret, "issues", "d1", {"action": "opened", "issue": gh_issue(1, "t", body)})
+
+    snippet = (await client.get("/search", params={"q": "crash"})).json()["items"][0]["snippet"]
+    assert "<script>" not in snippet and "<b>" not in snippet
+    assert snippet.startswith("<mark>crash</mark> &lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp;")
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_backfill_follows_link_pages(event_db):
+    page1 = respx.get(f"{BASE}/repos/{OWNER}/{REPO}/issues", params={"page": "1"}).mock(
+        return_value=httpx.Response(200, json=[gh_issue(1, "Alpha", "first")],
+                                    headers={"Link": '<https://api.github.com/x?page=2>; rel="next"'})
+    )
+    page2 = respx.get(f"{BASE}/repos/{OWNER}/{REPO}/issues", params={"page": "2"}).mock(
+        return_value=httpx.Response(200, json=[gh_issue(2, "Beta", "second")])
+    )
+    respx.get(url__regex=rf"{BASE}/repos/{OWNER}/{REPO}/issues/\d+/comments").mock(
+        return_value=httpx.Response(200, json=[])
+    )
+
+    counts = await fts.backfill()
+    assert page1.called and page2.called
+    assert counts == {"issues": 2, "comments": 0}
+    items, _ = await fts.search("beta")
+    assert [i["number"] for i in items] == [2]
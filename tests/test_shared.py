@@ -0,0 +1,119 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+import respx
+
+from src.shared import MemoryBackend, SQLiteBackend
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+BASE  = "https://api.github.com"
+
+ISSUE = {"number": 5, "html_url": "x", "state": "open", "title": "t", "body": None,
+         "labels": [], "created_at": "a", "updated_at": "a"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def backend(request, tmp_path):
+    b = MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "shared.db"))
+    yield b
+    await b.aclose()
+
+
+@pytest.mark.asyncio
+async def test_backend_contract(backend):
+    assert await backend.get("k") is None
+    await backend.set("k", "v", ttl=0.05)
+    assert await backend.get("k") == "v"
+    assert await backend.add("k", "other", ttl=1) is False
+    await asyncio.sleep(0.06)
+    assert await backend.get("k") is None
+    assert await backend.add("k", "mine", ttl=1) is True
+
+    assert await backend.incr("n") == 1
+    assert await backend.incr("n", 4) == 5
+    await backend.set("budget", "2")
+    assert await backend.decr_if_above("budget", 0) == 1
+    assert await backend.decr_if_above("budget", 0) == 0
+    assert await backend.decr_if_above("budget", 0) is None
+
+
+def _take_all(path: str) -> int:
+    async def run():
+        b = SQLiteBackend(path)
+        taken = 0
+        while await b.decr_if_above("budget", 0) is not None:
+            taken += 1
+        await b.aclose()
+        return taken
+    return asyncio.run(run())
+
+
+@pytest.mark.asyncio
+async def test_sqlite_budget_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    b = SQLiteBackend(path)
+    await b.set("budget", "200")
+    await b.aclose()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        taken = list(pool.map(_take_all, [path] * 4))
+    assert sum(taken) == 200  # no unit handed out twice
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_reads_hit_github_once_and_webhook_invalidates(client, webhook_secret, event_db):
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=ISSUE)
+    route = respx.get(f"{BASE}/repos/{OWNER}/{REPO}/issues/5").mock(side_effect=slow)
+
+    responses = await asyncio.gather(*[client.get("/issues/5") for _ in range(10)])
+    assert all(r.status_code == 200 for r in responses)
+    assert route.call_count == 1  # single-flight + cache
+    await client.get("/issues/5")
+    assert route.call_count == 1
+
+    import hmac, hashlib, json
+    body = json.dumps({"action": "edited", "issue": ISSUE}).encode()
+    sig = "sha256=" + hmac.new(webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+    resp = await client.post("/webhook", content=body, headers={
+        "X-GitHub-Event": "issues", "X-GitHub-Delivery": "inv-1",
+        "X-Hub-Signature-256": sig, "Content-Type": "application/json",
+    })
+    assert resp.status_code == 204
+    await client.get("/issues/5")
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_exhausted_budget_is_refused_locally(client):
+    reset = str(int(time.time()) + 600)
+    route = respx.get(f"{BASE}/repos/{OWNER}/{REPO}/issues/6").mock(
+        return_value=httpx.Response(200, json=dict(ISSUE, number=6),
+                                    headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    )
+    assert (await client.get("/issues/6")).status_code == 200
+    resp = await client.get("/issues/7")
+    assert resp.status_code == 502
+    assert resp.json()["detail"]["details"]["github_status"] == 429
+    assert route.call_count == 1
+
+
+def test_budget_is_keyed_per_token_not_owner(monkeypatch):
+    from src import ratelimit
+    from src.deps import get_container
+    s = get_container().settings
+    monkeypatch.setattr(s, "GITHUB_TOKEN", "ghp_first")
+    monkeypatch.setattr(s, "GITHUB_OWNER", "org-a")
+    first = ratelimit._keys()
+    monkeypatch.setattr(s, "GITHUB_OWNER", "org-b")
+    assert ratelimit._keys() == first  # same token, other owner -> same budget
+    monkeypatch.setattr(s, "GITHUB_TOKEN", "ghp_second")
+    assert ratelimit._keys() != first  # other token -> own budget
+    assert not any("ghp_" in k or "org-" in k for k in first + ratelimit._keys())
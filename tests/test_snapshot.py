@@ -0,0 +1,104 @@
+import os
+import httpx
+import pytest
+import respx
+
+from src import github_client as gh
+from src import cache, search, snapshot, stats, storage
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+BASE  = "https://api.github.com"
+ISSUES = f"{BASE}/repos/{OWNER}/{REPO}/issues"
+LINK = f'<{ISSUES}?page=2>; rel="next", <{ISSUES}?page=2>; rel="last"'
+
+
+def gh_issue(number, state="open", labels=("bug",)):
+    return {"number": number, "html_url": f"h{number}", "state": state, "title": f"Issue {number}",
+            "body": f"body {number}", "labels": [{"name": l} for l in labels],
+            "created_at": "a", "updated_at": "a"}
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_backfill_resumes_from_checkpoint(event_db, monkeypatch):
+    invalidated = []
+
+    async def count_invalidation(number=None):
+        invalidated.append(number)
+
+    monkeypatch.setattr(cache, "invalidate_issue", count_invalidation)
+    respx.get(ISSUES, params={"page": "1"}).mock(
+        return_value=httpx.Response(200, json=[gh_issue(1), gh_issue(2, "closed")], headers={"Link": LINK})
+    )
+    page2 = respx.get(ISSUES, params={"page": "2"}).mock(side_effect=[
+        httpx.Response(500, json={"message": "boom"}),
+        httpx.Response(200, json=[gh_issue(3, labels=("docs",))]),
+    ])
+    respx.get(url__regex=rf"{ISSUES}/\d+/comments").mock(
+        return_value=httpx.Response(200, json=[{"id": 77, "body": "needle", "user": {}, "created_at": "a", "html_url": "c"}])
+    )
+
+    with pytest.raises(gh.GitHubError):
+        await snapshot.backfill(with_comments=True, concurrency=1)
+    assert (await stats.get_stats())["issues"] == {"open": 1, "closed": 1}  # page 1 committed
+
+    totals = await snapshot.backfill(with_comments=True, concurrency=1)
+    assert totals == {"issues": 1, "comments": 1, "pages": 1}  # only page 2 this time
+    assert page2.call_count == 2
+
+    data = await stats.get_stats()
+    assert data["issues"] == {"open": 2, "closed": 1}
+    assert data["comments"] == 3
+    items, _ = await search.search("needle")
+    assert len(items) == 1  # comment id 77 indexed once (same id on every issue in this mock)
+    assert invalidated == []  # derived handlers only, no per-issue cache invalidation
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_failed_window_is_rolled_back_as_a_whole(event_db, monkeypatch):
+    respx.get(ISSUES, params={"page": "1"}).mock(
+        return_value=httpx.Response(200, json=[gh_issue(1)], headers={"Link": LINK})
+    )
+    respx.get(ISSUES, params={"page": "2"}).mock(return_value=httpx.Response(200, json=[gh_issue(2)]))
+    real_apply = snapshot._apply_page
+    calls = 0
+
+    async def apply_then_fail(db, issues, comments):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("disk full")  # page 1 of the window is already applied
+        return await real_apply(db, issues, comments)
+
+    monkeypatch.setattr(snapshot, "_apply_page", apply_then_fail)
+    with pytest.raises(RuntimeError):
+        await snapshot.backfill(concurrency=2)
+    assert (await stats.get_stats())["issues"] == {"open": 0, "closed": 0}  # nothing of the window kept
+
+    monkeypatch.setattr(snapshot, "_apply_page", real_apply)
+    assert (await snapshot.backfill(concurrency=2))["pages"] == 2  # no checkpoint -> whole window again
+    assert (await stats.get_stats())["issues"] == {"open": 2, "closed": 0}
+
+
+@pytest.mark.asyncio
+async def test_export_import_round_trip(event_db, tmp_path, monkeypatch):
+    import aiosqlite
+    from src import processors
+    async with aiosqlite.connect(event_db) as db:
+        for n in (1, 2):
+            await processors.process_event(db, "issues", "opened", {"action": "opened", "issue": gh_issue(n)})
+        await db.commit()
+    before = await stats.get_stats()
+
+    path = str(tmp_path / "snap.jsonl.gz")
+    counts = await snapshot.export_snapshot(path)
+    assert counts["issue_index"] == 2 and counts["search_fts"] == 2
+
+    # a brand-new replica
+    monkeypatch.setattr(storage, "DB_PATH", str(tmp_path / "replica.db"))
+    await snapshot.import_snapshot(path)
+    assert await stats.get_stats() == before
+    items, _ = await search.search("body")
+    assert {i["number"] for i in items} == {1, 2}
@@ -0,0 +1,78 @@
+import hmac, hashlib, json
+import pytest
+
+from src import processors
+
+
+def sign(secret: str, payload: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+
+
+async def send(client, secret, event, delivery, payload):
+    body = json.dumps(payload).encode()
+    headers = {
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": delivery,
+        "X-Hub-Signature-256": sign(secret, body),
+        "Content-Type": "application/json",
+    }
+    resp = await client.post("/webhook", content=body, headers=headers)
+    assert resp.status_code == 204
+
+
+def issue(number, state="open", labels=(), comments=0):
+    return {"number": number, "state": state, "labels": [{"name": l} for l in labels],
+            "comments": comments, "updated_at": "a"}
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_issue_and_comment_events(client, webhook_secret, event_db):
+    await send(client, webhook_secret, "issues", "d1", {"action": "opened", "issue": issue(1, labels=["bug"])})
+    await send(client, webhook_secret, "issues", "d2", {"action": "opened", "issue": issue(2, labels=["bug", "ui"])})
+    await send(client, webhook_secret, "issues", "d3", {"action": "closed", "issue": issue(2, "closed", ["bug", "ui"])})
+    await send(client, webhook_secret, "issue_comment", "d4", {"action": "created", "issue": issue(1)})
+    # redelivery of the same event must not be counted twice
+    await send(client, webhook_secret, "issue_comment", "d4", {"action": "created", "issue": issue(1)})
+
+    data = (await client.get("/stats")).json()
+    assert data["issues"] == {"open": 1, "closed": 1}
+    assert data["comments"] == 1
+    assert {"name": "bug", "open": 1, "closed": 1} in data["labels"]
+    assert {"name": "ui", "open": 0, "closed": 1} in data["labels"]
+
+    one = (await client.get("/stats/issues/1")).json()
+    assert one["comments"] == 1 and one["state"] == "open"
+    assert (await client.get("/stats/issues/99")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failing_handler_is_isolated(client, webhook_secret, event_db, monkeypatch):
+    async def broken(db, payload):
+        await db.execute("INSERT INTO totals (name, value) VALUES ('junk', 1)")
+        raise RuntimeError("boom")
+
+    handlers = [("issues", "opened", True, broken)] + list(processors._HANDLERS)
+    monkeypatch.setattr(processors, "_HANDLERS", handlers)
+    monkeypatch.setattr(processors, "_DISPATCH", {})
+
+    await send(client, webhook_secret, "issues", "d1", {"action": "opened", "issue": issue(7, labels=["bug"])})
+
+    data = (await client.get("/stats")).json()
+    assert data["issues"]["open"] == 1  # later handlers still ran
+
+    import aiosqlite
+    async with aiosqlite.connect(event_db) as db:
+        async with db.execute("SELECT COUNT(*) FROM totals WHERE name = 'junk'") as cur:
+            assert (await cur.fetchone())[0] == 0  # broken handler's write rolled back
+
+
+@pytest.mark.asyncio
+async def test_process_event_without_open_transaction_can_be_rolled_back(event_db):
+    import aiosqlite
+    async with aiosqlite.connect(event_db) as db:
+        assert not db.in_transaction
+        await processors.process_event(db, "issues", "opened", {"action": "opened", "issue": issue(9)})
+        assert db.in_transaction  # handlers didn't commit on their own
+        await db.rollback()
+        async with db.execute("SELECT COUNT(*) FROM issue_state WHERE number = 9") as cur:
+            assert (await cur.fetchone())[0] == 0
@@ -0,0 +1,70 @@
+import os
+import httpx
+import pytest
+import respx
+
+from src import write_queue
+
+OWNER = os.getenv("GITHUB_OWNER", "owner")
+REPO  = os.getenv("GITHUB_REPO", "repo")
+BASE  = "https://api.github.com"
+
+CREATED = {"number": 11, "html_url": "x", "state": "open", "title": "Queued", "body": None,
+           "labels": [], "created_at": "a", "updated_at": "a"}
+
+
+@pytest.fixture
+async def queue_db(event_db, monkeypatch):
+    monkeypatch.setattr(write_queue, "BACKOFF_BASE", 0.0)  # retries are due immediately
+    await write_queue.init_queue()
+    return event_db
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_queued_create_retries_and_replays_by_key(client, queue_db):
+    route = respx.post(f"{BASE}/repos/{OWNER}/{REPO}/issues").mock(side_effect=[
+        httpx.Response(502, json={"message": "Bad Gateway"}),
+        httpx.Response(201, json=CREATED),
+    ])
+    headers = {"Idempotency-Key": "k-1"}
+
+    resp = await client.post("/issues", json={"title": "Queued"}, headers=headers)
+    assert resp.status_code == 202
+    status_url = resp.headers["Location"]
+    assert (await client.get(status_url)).json()["status"] == "pending"
+
+    assert await write_queue.run_pending() == 2  # 502 -> retried -> 201
+    write = (await client.get(status_url)).json()
+    assert write["status"] == "succeeded" and write["attempts"] == 2
+    assert write["result"]["number"] == 11
+
+    # client retry with the same key -> original result, no new upstream call
+    resp = await client.post("/issues", json={"title": "Queued"}, headers=headers)
+    assert resp.status_code == 201
+    assert resp.headers["Location"] == "/issues/11"
+    assert resp.headers["Idempotent-Replayed"] == "true"
+    assert route.call_count == 2
+
+    resp = await client.post("/issues", json={"title": "Different"}, headers=headers)
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_permanent_failure_is_not_retried(client, queue_db):
+    route = respx.patch(f"{BASE}/repos/{OWNER}/{REPO}/issues/404").mock(
+        return_value=httpx.Response(404, json={"message": "Not Found"})
+    )
+    headers = {"Idempotency-Key": "k-2"}
+    resp = await client.patch("/issues/404", json={"state": "closed"}, headers=headers)
+    assert resp.status_code == 202
+
+    assert await write_queue.run_pending() == 1
+    assert route.call_count == 1
+    assert (await client.get(resp.headers["Location"])).json()["status"] == "failed"
+
+    resp = await client.patch("/issues/404", json={"state": "closed"}, headers=headers)
+    assert resp.status_code == 404
+    assert route.call_count == 1
+    assert (await client.get("/writes/nope")).status_code == 404